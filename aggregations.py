@@ -0,0 +1,510 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.dates import DATE_COLUMN
+from utils.fingerprint import append_history, derive_fingerprint, fingerprint, set_append_history, set_fingerprint
+
+# Rollup columns that products can be ranked by
+RANKING_METRICS = ['Quantity', 'Total', 'Profit', 'Margin']
+
+# Per-SKU running totals, mergeable across chunks of rows
+SKU_SUM_COLUMNS = ['Quantity', 'Total', 'Profit', 'Margin_sum', 'Margin_count', 'Price_sum', 'Rows']
+SKU_AGGREGATE_COLUMNS = SKU_SUM_COLUMNS + ['Price_min', 'Price_max']
+
+# Period lengths the time rollups are precomputed at, and their pandas
+# frequencies; weeks start on Monday
+TIME_GRAINS = {'day': 'D', 'week': 'W-MON', 'month': 'MS'}
+
+# Columns summed per period
+TIME_METRICS = ['Total', 'Quantity', 'Profit']
+
+
+def empty_sku_aggregates():
+    """
+    Return an empty per-SKU aggregate table to fold chunks into.
+    """
+    aggregates = pd.DataFrame(columns=SKU_AGGREGATE_COLUMNS, dtype='float64')
+    aggregates.index.name = 'SKU'
+    return aggregates
+
+
+def aggregate_sku_chunk(chunk):
+    """
+    Compute per-SKU partial aggregates for one chunk of cleaned rows.
+
+    Parameters:
+    - chunk: A DataFrame with an 'SKU' column and numeric Quantity, Total,
+      Profit, Margin and Price columns. Missing numeric columns count as 0.
+
+    Returns:
+    - A DataFrame indexed by SKU with the SKU_AGGREGATE_COLUMNS.
+    """
+    def column(name):
+        if name not in chunk.columns:
+            return pd.Series(0.0, index=chunk.index)
+        # Summed in float64 whatever the stored dtype, so narrow columns do
+        # not round the totals
+        return pd.to_numeric(chunk[name], errors='coerce').astype('float64')
+
+    frame = pd.DataFrame({
+        'SKU': chunk['SKU'],
+        'Quantity': column('Quantity'),
+        'Total': column('Total'),
+        'Profit': column('Profit'),
+        'Margin_sum': column('Margin'),
+        'Margin_count': column('Margin').notna().astype('float64'),
+        'Price_sum': column('Price'),
+        'Rows': 1.0,
+        'Price_min': column('Price'),
+        'Price_max': column('Price'),
+    })
+    grouped = frame.groupby('SKU', sort=False, observed=True)
+    aggregates = grouped[SKU_SUM_COLUMNS].sum()
+    aggregates['Price_min'] = grouped['Price_min'].min()
+    aggregates['Price_max'] = grouped['Price_max'].max()
+    return aggregates.astype('float64')
+
+
+def merge_sku_aggregates(left, right):
+    """
+    Fold two per-SKU aggregate tables into one.
+
+    Parameters:
+    - left: The running aggregate table.
+    - right: The aggregates of a new chunk.
+
+    Returns:
+    - A DataFrame indexed by SKU with the combined totals.
+    """
+    if left.empty:
+        return right
+    if right.empty:
+        return left
+    grouped = pd.concat([left, right]).groupby(level=0, sort=False, observed=True)
+    merged = grouped[SKU_SUM_COLUMNS].sum()
+    merged['Price_min'] = grouped['Price_min'].min()
+    merged['Price_max'] = grouped['Price_max'].max()
+    merged.index.name = 'SKU'
+    return merged
+
+
+def kpis_from_sku_aggregates(aggregates):
+    """
+    Compute the overview KPIs from a per-SKU aggregate table.
+
+    Returns:
+    - A dict with total_profit, total_sales and total_items_sold.
+    """
+    return {
+        'total_profit': float(aggregates['Profit'].sum()),
+        'total_sales': float(aggregates['Total'].sum()),
+        'total_items_sold': int(aggregates['Quantity'].sum()),
+    }
+
+
+def finalize_sku_aggregates(aggregates):
+    """
+    Add the mean Margin and Price columns to a per-SKU aggregate table, in
+    place, turning it into the SKU rollup the dashboard reads from.
+    """
+    aggregates['Margin'] = aggregates['Margin_sum'] / aggregates['Margin_count'].where(aggregates['Margin_count'] > 0)
+    aggregates['Price'] = aggregates['Price_sum'] / aggregates['Rows'].where(aggregates['Rows'] > 0)
+    return aggregates
+
+
+def compute_sku_rollup(data):
+    """
+    Compute the per-SKU rollup of a row-level frame in one groupby pass.
+
+    Returns:
+    - A DataFrame indexed by SKU, in order of first appearance, with summed
+      Quantity, Total and Profit, mean Margin and Price, the row count in
+      'Rows' and the mergeable aggregate columns.
+    """
+    return finalize_sku_aggregates(aggregate_sku_chunk(data))
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _cached_sku_rollup(data_fingerprint, _data):
+    rollup = compute_sku_rollup(_data)
+    return set_fingerprint(rollup, derive_fingerprint(data_fingerprint, 'sku_rollup'))
+
+
+def split_appended(data, history):
+    """
+    Split a dataset built by appending rows into its previous version and
+    the rows appended to it.
+
+    Parameters:
+    - data: The dataset.
+    - history: Its append history, as returned by append_history.
+
+    Returns:
+    - A tuple (previous version, appended rows). The previous version is a
+      view of the first rows carrying its own fingerprint and history, so
+      its cached aggregates are found again.
+    """
+    *earlier, (previous_fingerprint, previous_rows) = history
+    previous = set_fingerprint(data.iloc[:previous_rows], previous_fingerprint)
+    set_append_history(previous, earlier)
+    return previous, data.iloc[previous_rows:]
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _cached_appended_sku_rollup(data_fingerprint, history, _data):
+    previous, appended = split_appended(_data, history)
+    aggregates = merge_sku_aggregates(sku_rollup(previous)[SKU_AGGREGATE_COLUMNS], aggregate_sku_chunk(appended))
+    return set_fingerprint(finalize_sku_aggregates(aggregates), derive_fingerprint(data_fingerprint, 'sku_rollup'))
+
+
+def sku_rollup(data):
+    """
+    Return the per-SKU rollup of `data`, computed once per dataset and
+    filter state and shared by every tab.
+
+    For a dataset built by appending rows, the rollup of the previous
+    version is updated with the appended rows only, so the cost follows the
+    size of the new rows rather than the history.
+
+    The returned frame is shared between callers and must not be modified
+    in place.
+    """
+    history = append_history(data)
+    if history:
+        return _cached_appended_sku_rollup(fingerprint(data), history, data)
+    return _cached_sku_rollup(fingerprint(data), data)
+
+
+def top_k_positions(values, k):
+    """
+    Return the positions of the `k` largest values, largest first.
+
+    Uses a partial selection (np.argpartition) to find the k-th largest
+    value, so only the values at least that large are sorted, instead of
+    the whole array. NaN ranks last, and ties keep their original order,
+    also at the cut-off: of the values tied with the k-th, the first ones
+    are kept.
+
+    Parameters:
+    - values: A 1-D array-like of numbers.
+    - k: The number of positions to return.
+
+    Returns:
+    - A numpy array of at most `k` integer positions.
+    """
+    values = np.nan_to_num(np.asarray(values, dtype='float64'), nan=-np.inf)
+    k = max(0, min(k, len(values)))
+    if k == 0:
+        return np.empty(0, dtype='int64')
+    if k < len(values):
+        # argpartition picks arbitrarily among values tied with the k-th, so
+        # every value tied with it is kept and the cut is made after sorting
+        kth = values[np.argpartition(-values, k - 1)[k - 1]]
+        candidates = np.flatnonzero(values >= kth)
+    else:
+        candidates = np.arange(len(values))
+    # Break ties by position so equal values keep their first-appearance order
+    return candidates[np.lexsort((candidates, -values[candidates]))][:k]
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _cached_ranking(rollup_fingerprint, metric, k, _rollup):
+    # SKU labels rather than row positions, which would pick other rows of
+    # a rollup with the same fingerprint and its rows in another order
+    return _rollup.index[top_k_positions(_rollup[metric].to_numpy(), k)]
+
+
+def top_skus(rollup, metric, k):
+    """
+    Return the top `k` rows of a SKU rollup by `metric`, best first.
+
+    Rankings are cached per rollup, metric and k, so switching the metric
+    back and forth only reads an already computed ranking.
+
+    Parameters:
+    - rollup: A SKU rollup, as returned by sku_rollup.
+    - metric: One of RANKING_METRICS.
+    - k: The number of products to return.
+
+    Returns:
+    - A DataFrame with the top `k` rollup rows.
+    """
+    if metric not in RANKING_METRICS:
+        raise ValueError(f"Cannot rank products by '{metric}'")
+    return rollup.loc[_cached_ranking(fingerprint(rollup), metric, k, rollup)]
+
+
+def reduce_sku_rollup(rollup, metric, n, other_label='Other'):
+    """
+    Keep the top `n` SKUs of a rollup by `metric` and collapse every other
+    SKU into a single `other_label` row, so charts draw at most n + 1 bars
+    however large the catalog is.
+
+    The "Other" row sums the mergeable aggregate columns of the collapsed
+    SKUs, so its mean Margin and Price are weighted by their row counts.
+
+    Parameters:
+    - rollup: A SKU rollup, as returned by sku_rollup.
+    - metric: One of RANKING_METRICS.
+    - n: The number of SKUs to keep.
+    - other_label: The index label of the collapsed row.
+
+    Returns:
+    - A rollup with the top SKUs, best first, followed by the "Other" row
+      when any SKU was collapsed.
+    """
+    top = top_skus(rollup, metric, n)
+    if len(top) == len(rollup):
+        return top
+    rest = rollup.drop(index=top.index)
+    other = rest[SKU_SUM_COLUMNS].sum()
+    other['Price_min'] = rest['Price_min'].min()
+    other['Price_max'] = rest['Price_max'].max()
+    other = pd.DataFrame([other], index=pd.Index([other_label], name=rollup.index.name))
+    return finalize_sku_aggregates(pd.concat([top[SKU_AGGREGATE_COLUMNS], other[SKU_AGGREGATE_COLUMNS]]))
+
+
+def sorted_labels(labels):
+    """
+    Returns the distinct labels (e.g. SKUs or the categories of a column)
+    sorted by value. Appending a file adds its new categories after the
+    existing ones, so category order is not label order; labels of mixed
+    types, which cannot be compared, are sorted as text.
+    """
+    labels = pd.Index(labels).unique()
+    if isinstance(labels.dtype, pd.CategoricalDtype):
+        labels = labels.astype(labels.categories.dtype)
+    try:
+        return labels.sort_values()
+    except TypeError:
+        return labels[np.argsort(labels.astype(str), kind='stable')]
+
+
+class SkuIndex:
+    """
+    The SKU column of a dataset encoded as categorical codes, with an
+    inverted index from each SKU to its row positions.
+
+    Built once per dataset, it lets the sidebar filter select a few SKUs
+    at a cost proportional to the matching rows instead of the table size.
+    """
+    def __init__(self, skus):
+        if isinstance(skus.dtype, pd.CategoricalDtype):
+            codes = skus.cat.codes.to_numpy()
+            categories = skus.cat.categories
+        else:
+            codes, categories = pd.factorize(skus, sort=False)
+        self.categories = pd.Index(categories)
+        self._codes = codes
+        self._order = None
+        self._offsets = None
+
+    def _build(self):
+        # Rows grouped by code; rows with a missing SKU (code -1) sort first.
+        # Only built once a filter is applied, since the sidebar options
+        # need nothing but the categories
+        codes = self._codes
+        order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.categories))
+        missing = len(codes) - counts.sum()
+        # Sessions share the index; _order is set last, as it marks it built
+        self._offsets = np.concatenate([[missing], missing + np.cumsum(counts)])
+        self._order = order
+
+    def positions(self, skus):
+        """
+        Returns the sorted row positions of the given SKUs.
+        """
+        if self._order is None:
+            self._build()
+        codes = self.categories.get_indexer(skus)
+        parts = [self._order[self._offsets[code]:self._offsets[code + 1]] for code in codes if code >= 0]
+        if not parts:
+            return np.empty(0, dtype='int64')
+        return np.sort(np.concatenate(parts))
+
+    def filter(self, data, skus):
+        """
+        Returns the rows of `data` for the given SKUs, with a fresh index.
+        """
+        return data.take(self.positions(skus)).reset_index(drop=True)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _cached_sku_index(data_fingerprint, _data):
+    return SkuIndex(_data['SKU'])
+
+
+def sku_index(data):
+    """
+    Return the SkuIndex of `data`, built once per dataset.
+    """
+    return _cached_sku_index(fingerprint(data), data)
+
+
+def period_starts(dates, grain):
+    """
+    Returns the first day of the day, week or month each date falls in.
+
+    Parameters:
+    - dates: An array-like of datetimes without NaT.
+    - grain: One of TIME_GRAINS.
+
+    Returns:
+    - A numpy datetime64[D] array.
+    """
+    days = np.asarray(dates).astype('datetime64[D]')
+    if grain == 'day':
+        return days
+    if grain == 'week':
+        # Day 0, 1970-01-01, was a Thursday, three days after a Monday
+        return days - (days.astype('int64') + 3) % 7
+    if grain == 'month':
+        return days.astype('datetime64[M]').astype('datetime64[D]')
+    raise ValueError(f"Unknown time grain '{grain}'")
+
+
+class TimeRollups:
+    """
+    Day, week and month totals of a dataset's TIME_METRICS, overall and per
+    SKU, so switching the granularity of a chart reads a precomputed table.
+
+    The rows are grouped once, by SKU and day; the weekly and monthly tables
+    are rolled up from the daily one, which is much smaller than the rows.
+    Rows without a date are left out.
+
+    Appended rows are rolled up on their own: their totals are added to the
+    overall tables, which hold one row per period, and their per-SKU tables
+    are kept beside the earlier ones until per_sku() reads them.
+    """
+    def __init__(self, data):
+        per_sku, totals = self._rollup(self._day_table(data))
+        self._per_sku = {grain: (table,) for grain, table in per_sku.items()}
+        self._overall = {grain: self._continuous(table, grain) for grain, table in totals.items()}
+
+    @staticmethod
+    def _day_table(data):
+        dated = data[DATE_COLUMN].notna().to_numpy()
+
+        def column(name):
+            if name not in data.columns:
+                return np.zeros(dated.sum())
+            return pd.to_numeric(data[name], errors='coerce').to_numpy(dtype='float64')[dated]
+
+        frame = pd.DataFrame({
+            'SKU': data['SKU'].array[dated],
+            'Period': period_starts(data[DATE_COLUMN].to_numpy()[dated], 'day'),
+            **{name: column(name) for name in TIME_METRICS},
+        })
+        return frame.groupby(['SKU', 'Period'], sort=True, observed=True)[TIME_METRICS].sum()
+
+    @staticmethod
+    def _rollup(day_table):
+        # Returns the per-SKU and the overall table of every grain
+        per_sku = {'day': day_table}
+        totals = {}
+        for grain in TIME_GRAINS:
+            if grain != 'day':
+                skus = day_table.index.get_level_values('SKU')
+                periods = period_starts(day_table.index.get_level_values('Period'), grain)
+                per_sku[grain] = day_table.groupby([skus, pd.Index(periods, name='Period')], sort=True).sum()
+            totals[grain] = per_sku[grain].groupby(level='Period').sum()
+        return per_sku, totals
+
+    def appended(self, rows):
+        """
+        Returns the rollups of this dataset with `rows` appended, computed
+        from the new rows and the per-period totals only.
+        """
+        per_sku, totals = self._rollup(self._day_table(rows))
+        rollups = object.__new__(TimeRollups)
+        rollups._per_sku = {grain: tables + (per_sku[grain],) for grain, tables in self._per_sku.items()}
+        rollups._overall = {
+            grain: self._continuous(table.add(totals[grain], fill_value=0.0), grain)
+            for grain, table in self._overall.items()
+        }
+        return rollups
+
+    @staticmethod
+    def _continuous(table, grain):
+        # Periods without sales are shown as zeros rather than skipped
+        if table.empty:
+            return table
+        periods = pd.date_range(table.index.min(), table.index.max(), freq=TIME_GRAINS[grain], name='Period')
+        return table.reindex(periods, fill_value=0.0)
+
+    @property
+    def empty(self):
+        return self._overall['day'].empty
+
+    def overall(self, grain):
+        """
+        Returns the totals of every period of `grain`, indexed by the start
+        of the period and with no gaps.
+        """
+        return self._overall[grain]
+
+    def per_sku(self, grain, skus, metric):
+        """
+        Returns `metric` per period of `grain` for the given SKUs, one column
+        per SKU, on the same periods as overall().
+        """
+        parts = [
+            table[metric][table.index.get_level_values('SKU').isin(skus)]
+            for table in self._per_sku[grain]
+        ]
+        table = parts[0] if len(parts) == 1 else pd.concat(parts).groupby(level=['SKU', 'Period']).sum()
+        table = table.unstack('SKU', fill_value=0.0)
+        table = table.reindex(index=self._overall[grain].index, fill_value=0.0)
+        return table.reindex(columns=[sku for sku in skus if sku in table.columns])
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _cached_time_rollups(data_fingerprint, _data):
+    return TimeRollups(_data)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _cached_appended_time_rollups(data_fingerprint, history, _data):
+    previous, appended = split_appended(_data, history)
+    previous_rollups = time_rollups(previous)
+    if previous_rollups is None:
+        return TimeRollups(appended)
+    return previous_rollups.appended(appended)
+
+
+def time_rollups(data):
+    """
+    Return the TimeRollups of `data`, computed once per dataset and filter
+    state, or None when it has no parsed date column or no dated rows.
+
+    As with sku_rollup, a dataset built by appending rows updates the
+    rollups of its previous version with the appended rows only.
+    """
+    if DATE_COLUMN not in data.columns or not pd.api.types.is_datetime64_any_dtype(data[DATE_COLUMN]):
+        return None
+    history = append_history(data)
+    if history:
+        rollups = _cached_appended_time_rollups(fingerprint(data), history, data)
+    else:
+        rollups = _cached_time_rollups(fingerprint(data), data)
+    return None if rollups.empty else rollups
+
+
+def downsample_periods(table, max_points):
+    """
+    Sum runs of consecutive periods so a long range is drawn with at most
+    `max_points` points. Each point keeps the start of its first period,
+    and the totals over the whole range are unchanged.
+
+    Returns:
+    - A tuple (table, periods per point).
+    """
+    per_point = -(-len(table) // max_points) if len(table) > max_points else 1
+    if per_point == 1:
+        return table, 1
+    buckets = np.arange(len(table)) // per_point
+    downsampled = table.groupby(buckets).sum()
+    downsampled.index = table.index[::per_point]
+    return downsampled, per_point
@@ -1,9 +1,16 @@
 import streamlit as st
-from data_processor import load_data, process_data
+from data_processor import (
+    SOURCE_COLUMN, append_files, content_hash, load_data, load_stored_data, list_stored_datasets, memory_report,
+    process_files, process_files_chunked, shared_datasets_enabled
+)
 from tabs import overview, analysis, data_view
-from utils import css_injector, translator
-from components import cards, graphs
+from utils import css_injector, profiling, translator, warmup
+from components import cards, exports
 from utils.translator import Translator
+from utils.fingerprint import append_history, derive_fingerprint, fingerprint, set_fingerprint
+from aggregations import sku_index, sorted_labels
+from utils.dates import DATE_COLUMN
+from utils.excel_reader import SHEET_COLUMN
 import pandas as pd
 
 # Set page config
@@ -13,49 +20,59 @@ st.set_page_config(page_title="Product Sales Dashboard", layout="wide")
 # Instantiate the Translator
 translator = Translator()
 
+# Columns describing where a row came from rather than the sale itself
+METADATA_COLUMNS = [SHEET_COLUMN, SOURCE_COLUMN, DATE_COLUMN]
 
-def convert_to_float(value):
-    # If it's already a numeric type, return it as is
-    if isinstance(value, (int, float)):
-        return value
-
-    # If it's None or a variant of NaN, return 0.0
-    if pd.isnull(value):
-        return 0.0
-
-    # If the value is 'Non Numérique' or an empty string, return 0.0
-    if value in ['Non Numérique', '', 'nan', 'NaN']:
-        return 0.0
+# Session state key of the dataset later uploads are appended to, kept with
+# the content hashes of the files already in it
+CURRENT_DATASET_KEY = 'current_dataset'
 
-    # If the value is a string, attempt to clean and convert it
-    if isinstance(value, str):
-        # Remove common non-numeric characters
-        non_numeric_chars = [',', '%', '$', '€', '£', 'Dhs']
-        for char in non_numeric_chars:
-            value = value.replace(char, '')
+# Session state key of the content hashes of the files this session
+# uploaded; the stored dataset picker only offers these, since the store is
+# shared by every user of the server
+UPLOADED_DATASETS_KEY = 'uploaded_datasets'
 
-        # Strip whitespace and convert to float
-        try:
-            return float(value.strip())
-        except ValueError:
-            # Log an error if conversion fails
-            st.error(f"Could not convert value to float: {value}")
-            return 0.0
-
-    # If value is some other type, log an error and return 0.0
-    st.error(f"Encountered unexpected data type: {type(value)}")
-    return 0.0
 
 def validate_data(data):
-    # Check if any NaN values are present after conversion
-    data = data.fillna(0)
-    if data.isnull().any().any():
+    # Check if any NaN values are present after conversion. Only columns that
+    # actually hold NaN are filled, so the others keep sharing memory with the
+    # cached frame. Categorical columns keep their missing values, e.g. the
+    # sheet name of rows merged from a CSV, and rows without a date keep NaT,
+    # which the time rollups leave out; neither is checked
+    checked = [
+        column for column in data.columns
+        if column not in METADATA_COLUMNS
+        and not isinstance(data[column].dtype, pd.CategoricalDtype)
+        and not pd.api.types.is_datetime64_any_dtype(data[column])
+    ]
+    missing = [column for column in checked if data[column].hasnans]
+    if missing:
+        data = data.fillna({column: 0 for column in missing})
+    if data[checked].isnull().any().any():
         st.error("Some columns contain non-numeric values that could not be converted.")
         # Handle NaN values as required, such as replacing with zeros
 
     return data
 
 
+def show_streaming_dashboard(aggregates, translation):
+    """
+    Render the dashboard from per-SKU aggregates produced by the streaming
+    ingestion mode. Only the overview KPIs and top products are available,
+    since the row-level data is never held in memory.
+    """
+    st.title(translation["title"])
+    st.sidebar.header(translation["filter"])
+    selected_sku = st.sidebar.multiselect(translation["select_sku"], options=aggregates.index)
+    if selected_sku:
+        aggregates_fingerprint = fingerprint(aggregates)
+        aggregates = aggregates.loc[selected_sku]
+        # The selection order is the row order, so it is part of the fingerprint
+        set_fingerprint(aggregates, derive_fingerprint(aggregates_fingerprint, 'SKU', list(map(str, selected_sku))))
+
+    st.info(translation["streaming_mode_info"])
+    overview.show_aggregates(aggregates, translation)
+
 
 def main():
     # Inject custom CSS
@@ -70,29 +87,90 @@ def main():
     # Retrieve translations for the selected language
     translation = {key: translator.get_translation(language, key) for key in translator.translations["English"].keys()}
 
+    # Opt-in timings of every stage of this rerun
+    debug = st.sidebar.checkbox(translation["debug_panel"])
+    with profiling.record_run(debug) as recorder:
+        show_dashboard(translation)
+    profiling.show_debug_panel(recorder, translation)
+
+
+def show_dashboard(translation):
+    """
+    Ingest the uploaded or stored data and render the dashboard.
+    """
     # Initialize data
     data = None
 
-    # Initialize data and upload file section
-    uploaded_file = st.file_uploader(
+    # Streaming mode aggregates large files chunk by chunk instead of loading them
+    streaming_mode = st.sidebar.checkbox(translation["streaming_mode"], help=translation["streaming_mode_help"])
+
+    # Initialize data and upload file section; several files are merged into one dataset
+    uploaded_files = st.file_uploader(
     translation["upload_prompt"], 
-    type=["csv", "xls", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"]
+    type=["csv", "xls", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"],
+    accept_multiple_files=True
 )
 
-    
-    if uploaded_file is not None:
-        # Check the file extension and process accordingly
-        file_extension = uploaded_file.name.split('.')[-1].lower()
-        if file_extension in ['csv', 'xls', 'xlsx']:
-            data = process_data(uploaded_file, file_extension)
+    if uploaded_files and streaming_mode:
+        with profiling.stage('ingest (streaming)') as record:
+            aggregates = process_files_chunked(uploaded_files)
+            record.rows_out = None if aggregates is None else len(aggregates)
+        if aggregates is None:
+            st.error(translation["process_error"])
+        else:
+            show_streaming_dashboard(aggregates, translation)
+        return
+
+    # Append mode adds new uploads to the current dataset instead of replacing it
+    append_mode = st.sidebar.checkbox(translation["append_mode"], help=translation["append_mode_help"])
+    current = st.session_state.get(CURRENT_DATASET_KEY) if append_mode else None
+
+    if uploaded_files:
+        # Check the file extensions and process accordingly
+        if all(uploaded_file.name.split('.')[-1].lower() in ['csv', 'xls', 'xlsx'] for uploaded_file in uploaded_files):
+            if current is not None:
+                # Only the files not in the dataset yet are read and appended
+                with profiling.stage('ingest (append)') as record:
+                    current_data, known_files = current
+                    data, known_files = append_files(current_data, uploaded_files, known_files)
+                    record.rows_out = len(data)
+            else:
+                with profiling.stage('ingest') as record:
+                    data = process_files(uploaded_files)
+                    record.rows_out = None if data is None else len(data)
+                known_files = frozenset(content_hash(uploaded_file.getvalue()) for uploaded_file in uploaded_files)
         else:
             st.error(translation["file_type_error"])  # Provide a translation for unsupported file types
 
         if data is None:
             st.error(translation["process_error"])
         else:
+            st.session_state[CURRENT_DATASET_KEY] = (data, known_files)
+            st.session_state[UPLOADED_DATASETS_KEY] = st.session_state.get(UPLOADED_DATASETS_KEY, frozenset()) | known_files
             # Show this warning if no file is uploaded
             st.warning(translation["please_upload"])
+    elif current is not None:
+        # Files removed from the uploader stay in the dataset they were appended to
+        data = current[0]
+    else:
+        # Datasets this session uploaded earlier can be reopened from the on-disk store
+        own_datasets = None if shared_datasets_enabled() else st.session_state.get(UPLOADED_DATASETS_KEY, frozenset())
+        stored_names = {dataset['id']: dataset['name'] for dataset in list_stored_datasets(own_datasets)}
+        if stored_names:
+            dataset_id = st.sidebar.selectbox(
+                translation["stored_datasets"],
+                [None] + list(stored_names),
+                format_func=lambda dataset_id: translation["no_stored_dataset"] if dataset_id is None else stored_names[dataset_id]
+            )
+            if dataset_id is not None:
+                with profiling.stage('load stored dataset') as record:
+                    data = load_stored_data(dataset_id)
+                    record.rows_out = None if data is None else len(data)
+                if data is not None:
+                    st.session_state[CURRENT_DATASET_KEY] = (data, frozenset())
+
+    if append_mode and data is not None:
+        st.sidebar.caption(translation["append_mode_info"].format(files=len(append_history(data)), rows=len(data)))
 
     # # Now use the translation dict to access the translations
     # uploaded_file = st.file_uploader(translation["upload_prompt"], type="csv")  # Assuming you have a key "upload_prompt"
@@ -107,6 +185,8 @@ def main():
     # Ensure data is not empty
     if data is None or data.empty:
         st.warning(translation["please_upload"])
+        # Load the plotting and export modules while the user picks a file
+        warmup.start_warmup()
         return
 
     # Replace the title
@@ -116,47 +196,62 @@ def main():
 
     # Filtering options in sidebar
     if 'SKU' in data.columns:
-        selected_sku = st.sidebar.multiselect(translation["select_sku"], options=data['SKU'].unique())
+        # Options and row lookups come from the SKU index built once per dataset
+        with profiling.stage('sku index', len(data)):
+            index = sku_index(data)
+        selected_sku = st.sidebar.multiselect(translation["select_sku"], options=sorted_labels(index.categories))
         if selected_sku:
-            data = data[data['SKU'].isin(selected_sku)]
-            # Reset index after filtering
-            data.reset_index(drop=True, inplace=True)
-
-    # Tabs setup
-    tab1, tab2, tab3 = st.tabs([translation["overview_tab"], translation["analysis_tab"], translation["data_view_tab"]])
+            with profiling.stage('sku filter', len(data)) as record:
+                data_fingerprint = fingerprint(data)
+                data = index.filter(data, selected_sku)
+                # Cached views key on the fingerprint, so record the filter in it
+                set_fingerprint(data, derive_fingerprint(data_fingerprint, 'SKU', sorted(map(str, selected_sku))))
+                record.rows_out = len(data)
+
+    # Tabs setup; the selected tab is tracked on the server and switching
+    # tabs reruns the script, so only the open tab's content is computed.
+    # Charts and rollups of a tab opened before come from their caches.
+    tab1, tab2, tab3 = st.tabs(
+        [translation["overview_tab"], translation["analysis_tab"], translation["data_view_tab"]],
+        key="active_tab",
+        on_change="rerun"
+    )
 
-    # Apply this function to your data columns that require numeric conversion
-    data['Price'] = data['Price'].apply(convert_to_float)
-    data['Margin'] = data['Margin'].apply(convert_to_float)
-    data['Total'] = data['Total'].apply(convert_to_float)
+    # Price, Margin and Total are already converted to floats by process_data
     # Overview Tab Content
-    with tab1:
-        validation_result = validate_data(data)
-        if validation_result is None:
-            st.error(translation["data_error"])
-            return
-        overview.show(data, translation)
+    if tab1.open:
+        with tab1:
+            with profiling.stage('validate', len(data)):
+                validation_result = validate_data(data)
+            if validation_result is None:
+                st.error(translation["data_error"])
+                return
+            with profiling.stage('overview tab', len(data)):
+                overview.show(data, translation)
 
     # Detailed Analysis Tab Content
-    with tab2:
-        analysis.show(data, translation)
+    if tab2.open:
+        with tab2:
+            with profiling.stage('analysis tab', len(data)):
+                analysis.show(data, translation)
 
     # Data View Tab Content
-    with tab3:
-        data_view.show(data, translation)
-
-    # Download CSV button
-    st.download_button(
-        label=translation["download_csv"],
-        data=graphs.convert_df_to_csv(data),
-        file_name='sales_data.csv',
-        mime='text/csv'
-    )
+    if tab3.open:
+        with tab3:
+            with profiling.stage('data view tab', len(data)):
+                data_view.show(data, translation)
+
+    # Download button; the export is only built when it is clicked
+    exports.download_controls(data, translation, 'sales_data', 'download-data')
 
     # Display statistical summary
     if st.checkbox(translation["show_summary"]):
         st.write(data.describe())
 
+    # Memory used by each column against pandas' default dtypes
+    if st.checkbox(translation["show_memory_report"]):
+        st.dataframe(memory_report(data))
+
 # Run the main function
 if __name__ == "__main__":
     main()
@@ -0,0 +1,188 @@
+"""
+Write the dashboard's KPIs and charts for many sales files without a
+Streamlit session.
+
+Each input file is read and cleaned like an upload, then its overview KPIs,
+top products and charts are computed with the same code the dashboard uses.
+Files are processed in parallel, one per worker process. For every file the
+output directory gets a <file name>/ folder with kpis.json and the chart
+images; files with the same name in different directories get the name
+followed by a hash of their path.
+
+Run from the repository root:
+
+    python batch_report.py stores/*.csv --output reports --workers 8
+"""
+import argparse
+import collections
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+from streamlit.logger import set_log_level
+
+# Charts are only ever written to files here
+matplotlib.use('Agg')
+
+# The dashboard caches work without a session; don't warn about it
+set_log_level('ERROR')
+
+from aggregations import RANKING_METRICS, compute_sku_rollup, kpis_from_sku_aggregates, reduce_sku_rollup, top_skus
+from components.graphs import figure_to_png
+from data_processor import load_file
+from tabs.overview import (
+    draw_profit_margin_chart,
+    draw_profitability_chart,
+    draw_sales_over_time_chart,
+    draw_unit_price_distribution_chart,
+)
+from utils.translator import Translator
+
+
+def _top_products(rollup, metric, count):
+    top = top_skus(rollup, metric, count)
+    return [
+        {'SKU': sku, **{column: top.at[sku, column] for column in RANKING_METRICS}}
+        for sku in top.index
+    ]
+
+
+def report_names(file_paths):
+    """
+    Name the report folder of each file: its file name, followed by a short
+    hash of its absolute path when other inputs share that file name.
+
+    Returns:
+    - A list of folder names, in the order of `file_paths`.
+
+    Raises:
+    - ValueError: When two inputs would still write to the same folder,
+      i.e. the same file is listed twice.
+    """
+    basenames = [os.path.basename(file_path) for file_path in file_paths]
+    counts = collections.Counter(basenames)
+    names = []
+    for file_path, basename in zip(file_paths, basenames):
+        if counts[basename] > 1:
+            path_hash = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:8]
+            basename = f'{basename}-{path_hash}'
+        names.append(basename)
+    duplicates = sorted(name for name, count in collections.Counter(names).items() if count > 1)
+    if duplicates:
+        raise ValueError(f"several inputs would be reported to the same folder: {', '.join(duplicates)}")
+    return names
+
+
+def write_report(file_path, output_dir, language='English', top_count=10, sku_count=20, report_name=None):
+    """
+    Read one sales file and write its KPI JSON and chart images.
+
+    Parameters:
+    - file_path: The CSV or Excel file to report on.
+    - output_dir: The directory that receives the report folder.
+    - language: The language of the chart titles and labels.
+    - top_count: The number of products listed per ranking metric.
+    - sku_count: The number of SKUs drawn before the rest are grouped.
+    - report_name: The name of the report folder, from report_names;
+      defaults to the file name.
+
+    Returns:
+    - A dict of timings in seconds for 'read', 'aggregate', 'charts' and
+      'total', plus the 'rows' read.
+    """
+    translator = Translator()
+    translations = {key: translator.get_translation(language, key) for key in translator.translations['English']}
+
+    start = time.perf_counter()
+    data, errors = load_file(file_path, excel_workers=1)
+    read_done = time.perf_counter()
+
+    report_dir = os.path.join(output_dir, report_name or os.path.basename(file_path))
+    os.makedirs(report_dir, exist_ok=True)
+
+    rollup = compute_sku_rollup(data)
+    report = {
+        'source': os.path.abspath(file_path),
+        'rows': len(data),
+        'skus': len(rollup),
+        'kpis': kpis_from_sku_aggregates(rollup),
+        'top_products': {metric: _top_products(rollup, metric, top_count) for metric in RANKING_METRICS},
+        'cleaning_errors': errors,
+    }
+    with open(os.path.join(report_dir, 'kpis.json'), 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2, ensure_ascii=False, default=str)
+    aggregate_done = time.perf_counter()
+
+    charts = {
+        'unit_price_distribution': lambda: draw_unit_price_distribution_chart(
+            data['Price'], translations['unit_price_distribution']
+        ),
+        'profit_margin_by_sku': lambda: draw_profit_margin_chart(
+            reduce_sku_rollup(rollup, 'Margin', sku_count, translations['other']), translations['profit_margin_by_sku']
+        ),
+        'sales_by_sku': lambda: draw_sales_over_time_chart(
+            reduce_sku_rollup(rollup, 'Total', sku_count, translations['other'])
+        ),
+        'profitability': lambda: draw_profitability_chart(
+            rollup, top_skus(rollup, 'Profit', top_count).index.tolist()
+        ),
+    }
+    for name, draw in charts.items():
+        with open(os.path.join(report_dir, f'{name}.png'), 'wb') as handle:
+            handle.write(figure_to_png(draw()))
+    charts_done = time.perf_counter()
+
+    return {
+        'rows': len(data),
+        'read': read_done - start,
+        'aggregate': aggregate_done - read_done,
+        'charts': charts_done - aggregate_done,
+        'total': charts_done - start,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('files', nargs='+', help="CSV, XLS or XLSX sales files")
+    parser.add_argument('--output', default='reports', help="Directory the reports are written to")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Files processed at the same time")
+    parser.add_argument('--language', default='English', help="Language of the chart labels")
+    parser.add_argument('--top', type=int, default=10, help="Products listed per ranking metric")
+    parser.add_argument('--skus', type=int, default=20, help="SKUs drawn per chart before grouping the rest")
+    args = parser.parse_args()
+    try:
+        names = report_names(args.files)
+    except ValueError as e:
+        parser.error(str(e))
+
+    failures = 0
+    start = time.perf_counter()
+    print(f"{'file':<40} {'rows':>10} {'read s':>8} {'agg s':>8} {'charts s':>9} {'total s':>8}")
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(write_report, file_path, args.output, args.language, args.top, args.skus, name): name
+            for file_path, name in zip(args.files, names)
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                timings = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"{name:<40} failed: {e}", file=sys.stderr)
+                continue
+            print(
+                f"{name:<40} {timings['rows']:>10,} {timings['read']:>8.2f} {timings['aggregate']:>8.2f} "
+                f"{timings['charts']:>9.2f} {timings['total']:>8.2f}"
+            )
+    elapsed = time.perf_counter() - start
+    print(f"{len(args.files) - failures}/{len(args.files)} files reported to {args.output} in {elapsed:.2f}s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Compare appending a file to a dataset with reloading the whole dataset.
+
+A --history rows dataset is loaded and its rollups computed, then a
+--delta rows file is appended to it. The append path parses the new file
+alone, appends it and updates the SKU rollup, KPIs, rankings and time
+rollups from the new rows; the reload path parses the concatenated file and
+computes everything again. Both must give the same results.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_append --history 100000 1000000 --delta 5000
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from streamlit.logger import set_log_level
+
+set_log_level('ERROR')
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from aggregations import (
+    RANKING_METRICS,
+    TIME_GRAINS,
+    TimeRollups,
+    compute_sku_rollup,
+    kpis_from_sku_aggregates,
+    sku_rollup,
+    time_rollups,
+    top_skus,
+)
+from benchmarks.synthetic import make_sales_data
+from data_processor import FRENCH_COLUMN_RENAMES, append_data, parse_file_bytes
+from utils.fingerprint import set_fingerprint
+
+TOP_PRODUCTS = 10
+
+
+def to_csv_bytes(data):
+    return data.to_csv(index=False).encode('utf-8')
+
+
+def summaries(rollup, rollups):
+    """The KPIs, rankings and time totals the overview tab shows."""
+    return (
+        kpis_from_sku_aggregates(rollup),
+        {metric: list(top_skus(rollup, metric, TOP_PRODUCTS).index.astype(str)) for metric in RANKING_METRICS},
+        {grain: rollups.overall(grain) for grain in TIME_GRAINS},
+    )
+
+
+def append_path(history, delta_bytes, rename_items):
+    delta, _ = parse_file_bytes(delta_bytes, 'csv', rename_items)
+    data = append_data(history, set_fingerprint(delta, 'delta'))
+    return summaries(sku_rollup(data), time_rollups(data))
+
+
+def reload_path(all_bytes, rename_items):
+    data, _ = parse_file_bytes(all_bytes, 'csv', rename_items)
+    return summaries(compute_sku_rollup(data), TimeRollups(data))
+
+
+def same_results(appended, reloaded):
+    kpis, rankings, overall = appended
+    full_kpis, full_rankings, full_overall = reloaded
+    return (
+        np.allclose(list(kpis.values()), list(full_kpis.values()))
+        and rankings == full_rankings
+        and all(np.allclose(overall[grain], full_overall[grain]) for grain in TIME_GRAINS)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--history', type=int, nargs='+', default=[100_000, 1_000_000], help="Rows already loaded")
+    parser.add_argument('--delta', type=int, default=5_000, help="Rows in the appended file")
+    parser.add_argument('--skus', type=int, default=5_000)
+    parser.add_argument('--days', type=int, default=730, help="Days of sales in the history")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rename_items = tuple(FRENCH_COLUMN_RENAMES.items())
+    # The appended file holds the last day's sales again, with one new SKU
+    delta = make_sales_data(args.delta, min(args.skus, args.delta), days=1, seed=1)
+    delta['SKU'] = delta['SKU'].astype(str)
+    delta.loc[0, 'SKU'] = 'SKU-NEW'
+
+    print(f"{'history':>10} {'delta':>7}  {'append s':>9} {'reload s':>9} {'speed-up':>9}")
+    for rows in args.history:
+        history_frame = make_sales_data(rows, args.skus, days=args.days)
+        delta_bytes = to_csv_bytes(delta)
+        all_bytes = to_csv_bytes(pd.concat([history_frame, delta], ignore_index=True))
+        history, _ = parse_file_bytes(to_csv_bytes(history_frame), 'csv', rename_items)
+        set_fingerprint(history, 'history')
+
+        append_timings, reload_timings = [], []
+        for _ in range(args.repeat):
+            st.cache_resource.clear()
+            st.cache_data.clear()
+            # The history's rollups are already cached when a file is appended
+            sku_rollup(history)
+            time_rollups(history)
+            start = time.perf_counter()
+            appended = append_path(history, delta_bytes, rename_items)
+            append_timings.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            reloaded = reload_path(all_bytes, rename_items)
+            reload_timings.append(time.perf_counter() - start)
+            if not same_results(appended, reloaded):
+                sys.exit(f"the appended and reloaded datasets of {rows:,} rows differ")
+
+        append_median = statistics.median(append_timings)
+        reload_median = statistics.median(reload_timings)
+        print(
+            f"{rows:>10,} {args.delta:>7,}  {append_median:>9.3f} {reload_median:>9.3f} "
+            f"{reload_median / append_median:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Measure the delta messages and bytes the overview cards send per rerun,
+rendered card by card as before and as batched card rows now.
+
+Every ForwardMsg carrying a delta that the script runner sends during one
+full AppTest rerun is counted, with its serialized size. The page injects
+the stylesheets, then renders the three KPI cards and --cards top product
+cards, like the overview tab.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_delta_bytes --cards 3 12 30
+"""
+import argparse
+import os
+import sys
+
+from streamlit.logger import set_log_level
+
+set_log_level('ERROR')
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner.script_runner import ScriptRunner
+from streamlit.testing.v1 import AppTest
+
+from components.cards import metric_card_html, render_card_row, statistic_card_html
+from tabs.overview import format_top_products
+from utils import css_injector
+from utils.number_format import format_number
+from utils.translator import Translator
+
+
+def legacy_add_custom_css(file_path='static/styles.css'):
+    """
+    The stylesheet injection before: the file read on every rerun and sent
+    as a markdown element.
+    """
+    with open(file_path) as f:
+        css_code = f.read()
+        css_code += '\n#MainMenu {visibility: hidden;}\nfooter {visibility: hidden;}'
+        st.markdown(f'<style>{css_code}</style>', unsafe_allow_html=True)
+
+
+def legacy_statistic_card(label, value):
+    """
+    The KPI card before, with inline styles and one markdown call per card.
+    """
+    st.markdown(f"""
+        <div style="
+            background-color: #ffffff;
+            padding: 10px 15px;
+            border-radius: 5px;
+            border: 1px solid #ddd;
+            text-align: center;
+            margin: 10px 0px;
+            box-shadow: 1px 1px 3px rgba(0,0,0,0.1);">
+            <h3 style="color: #000000; margin:0;">{value}</h3>
+            <p style="color: #000000; margin:5px 0px;">{label}</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+
+def legacy_multi_metric_card(rank, sku, metrics, translations):
+    """
+    The top product card before, repeating its style block in every card.
+    """
+    rank_symbol = {1: "🥇", 2: "🥈", 3: "🥉"}.get(rank, "")
+    with st.container():
+        st.markdown(f"""
+            <style>
+            .metric-container {{
+                border-radius: 10px;
+                background-color: #f8f9fa;
+                box-shadow: 0 4px 8px 0 rgba(0,0,0,0.2);
+                transition: 0.3s;
+                padding: 15px;
+                margin-bottom: 10px;
+            }}
+            .metric-container:hover {{
+                box-shadow: 0 8px 16px 0 rgba(0,0,0,0.2);
+            }}
+            .metric-title {{
+                font-size: 1.25rem;
+                font-weight: 500;
+                margin: 0;
+                padding: 0;
+                color: #333;
+            }}
+            .metric-value {{
+                font-size: 2rem;
+                font-weight: bold;
+                margin: 0;
+                padding: 0;
+                color: #1a73e8;  /* Change color to suit your branding */
+            }}
+            .metric-label {{
+                font-size: 1rem;
+                color: #6c757d;
+            }}
+            </style>
+            <div class="metric-container">
+                <p class="metric-title"><span class="rank-symbol">{rank_symbol}</span>{sku}</p>
+                <div class="row">
+                    <div class="col">
+                        <p class="metric-value">{metrics['Quantity']}</p>
+                        <p class="metric-label">{translations["total_items_sold"]}</p>
+                    </div>
+                    <div class="col">
+                        <p class="metric-value">{metrics['Total']}</p>
+                        <p class="metric-label">{translations["total_sales"]}</p>
+                    </div>
+                    <div class="col">
+                        <p class="metric-value">{metrics['Profit']}</p>
+                        <p class="metric-label">{translations["total_profit"]}</p>
+                    </div>
+                </div>
+            </div>
+        """, unsafe_allow_html=True)
+
+
+def sample_cards(count):
+    """
+    Returns English translations, KPI (label, value) pairs and the formatted
+    metrics of `count` top products.
+    """
+    translator = Translator()
+    translations = {key: translator.get_translation('English', key) for key in translator.translations['English']}
+    rng = np.random.default_rng(0)
+    top_products = pd.DataFrame({
+        'Quantity': rng.integers(1, 10_000, count),
+        'Total': np.round(rng.lognormal(10, 1, count), 2),
+        'Profit': np.round(rng.lognormal(8, 1, count), 2),
+    }, index=[f"SKU-{number:05d}" for number in range(count)])
+    kpis = [
+        (translations["total_profit"], format_number(top_products['Profit'].sum(), translations, 'currency')),
+        (translations["total_sales"], format_number(top_products['Total'].sum(), translations, 'currency')),
+        (translations["total_items_sold"], format_number(top_products['Quantity'].sum(), translations, 'quantity')),
+    ]
+    return translations, kpis, format_top_products(top_products, translations)
+
+
+def render_legacy(count):
+    translations, kpis, top_products = sample_cards(count)
+    legacy_add_custom_css()
+    for column, (label, value) in zip(st.columns(3), kpis):
+        with column:
+            legacy_statistic_card(label, value)
+    for row_start in range(0, len(top_products), 3):
+        columns = st.columns(3)
+        row = top_products.iloc[row_start:row_start + 3]
+        for offset, (sku, metrics) in enumerate(row.iterrows()):
+            with columns[offset]:
+                legacy_multi_metric_card(row_start + offset + 1, sku, metrics, translations)
+
+
+def render_batched(count):
+    translations, kpis, top_products = sample_cards(count)
+    css_injector.add_custom_css()
+    render_card_row([statistic_card_html(label, value) for label, value in kpis])
+    render_card_row([
+        metric_card_html(sku, [
+            (metrics['Quantity'], translations["total_items_sold"]),
+            (metrics['Total'], translations["total_sales"]),
+            (metrics['Profit'], translations["total_profit"]),
+        ], rank=rank)
+        for rank, (sku, metrics) in enumerate(top_products.iterrows(), start=1)
+    ])
+
+
+def cards_page(repo_root, batched, count):
+    """The cards of the overview tab, rendered one way or the other."""
+    import sys
+
+    sys.path.insert(0, repo_root)
+    from benchmarks.bench_delta_bytes import render_batched, render_legacy
+
+    (render_batched if batched else render_legacy)(count)
+
+
+class DeltaCounter:
+    """
+    Records the size of every delta ForwardMsg the script runners send.
+    """
+    def __init__(self):
+        self.sizes = []
+
+    def __enter__(self):
+        self._enqueue = ScriptRunner._enqueue_forward_msg
+        counter = self
+
+        def enqueue(runner, msg):
+            if msg.HasField('delta'):
+                counter.sizes.append(msg.ByteSize())
+            counter._enqueue(runner, msg)
+
+        ScriptRunner._enqueue_forward_msg = enqueue
+        return self
+
+    def __exit__(self, *exc_info):
+        ScriptRunner._enqueue_forward_msg = self._enqueue
+
+
+def measure(batched, count):
+    """Returns the delta messages and bytes of the second full rerun."""
+    at = AppTest.from_function(cards_page, args=(os.getcwd(), batched, count), default_timeout=120)
+    at.run()
+    if at.exception:
+        sys.exit(at.exception[0].message)
+    with DeltaCounter() as counter:
+        at.run()
+    return len(counter.sizes), sum(counter.sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cards', type=int, nargs='+', default=[3, 12, 30], help="Top product cards shown")
+    args = parser.parse_args()
+
+    print(f"{'cards':>6} {'before msgs':>12} {'before bytes':>13} {'after msgs':>11} {'after bytes':>12} {'saved':>7}")
+    for count in args.cards:
+        before_messages, before_bytes = measure(False, count)
+        after_messages, after_bytes = measure(True, count)
+        print(
+            f"{count:>6} {before_messages:>12} {before_bytes:>13,} {after_messages:>11} {after_bytes:>12,} "
+            f"{1 - after_bytes / before_bytes:>7.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Report the start-up import time of the dashboard, per package, and check it
+against a budget.
+
+`import app` is timed in fresh interpreters with `python -X importtime`, so
+nothing is already imported. Self times are summed per top-level package,
+and the modules that should only load with the first chart or export are
+listed if start-up imported them anyway. The background warm-up is timed
+last, in another fresh interpreter.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_import_time --budget 1.5
+"""
+import argparse
+import collections
+import os
+import statistics
+import subprocess
+import sys
+
+from utils.warmup import WARMUP_ENV, WARMUP_MODULES
+
+WARMUP_SCRIPT = """
+import app
+from utils import warmup
+warmup.start_warmup().join()
+print(warmup.warmup_seconds)
+"""
+
+
+def import_times(module):
+    """
+    Imports `module` in a fresh interpreter.
+
+    Returns:
+    - A tuple (cumulative seconds, {module name: self seconds}).
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, check=True
+    )
+    self_times = {}
+    cumulative = None
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        self_times[name] = int(self_us) / 1e6
+        if name == module:
+            cumulative = int(cumulative_us) / 1e6
+    return cumulative, self_times
+
+
+def warmup_time():
+    """Returns the seconds the background warm-up takes after `import app`."""
+    result = subprocess.run(
+        [sys.executable, '-c', WARMUP_SCRIPT],
+        capture_output=True, text=True, check=True, env={**os.environ, WARMUP_ENV: '1'}
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--module', default='app', help="Module to import")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=10, help="Packages listed")
+    parser.add_argument('--budget', type=float, help="Fail when the median import takes longer, in seconds")
+    args = parser.parse_args()
+
+    totals = []
+    packages = collections.defaultdict(list)
+    loaded = set()
+    for _ in range(args.repeat):
+        total, self_times = import_times(args.module)
+        totals.append(total)
+        per_package = collections.Counter()
+        for name, seconds in self_times.items():
+            per_package[name.split('.')[0]] += seconds
+        for package, seconds in per_package.items():
+            packages[package].append(seconds)
+        loaded.update(name for name in WARMUP_MODULES if name in self_times)
+
+    median = statistics.median(totals)
+    print(f"import {args.module}: median {median:.3f}s, min {min(totals):.3f}s over {args.repeat} runs")
+    print(f"{'package':<24} {'self s':>8}")
+    ranked = sorted(packages.items(), key=lambda item: -statistics.median(item[1]))
+    for package, seconds in ranked[:args.top]:
+        print(f"{package:<24} {statistics.median(seconds):>8.3f}")
+    print(f"deferred modules imported at start-up: {', '.join(sorted(loaded)) or 'none'}")
+    print(f"background warm-up ({WARMUP_ENV}): {warmup_time():.3f}s")
+
+    if args.budget is not None and median > args.budget:
+        sys.exit(f"import {args.module} took {median:.3f}s, over the {args.budget:.3f}s budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Measure multi-file ingestion throughput for 1 to N files, serial against
+the process pool used by process_files.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_multi_file_ingest --files 8 --rows 200000
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import data_processor
+from data_processor import FRENCH_COLUMN_RENAMES, content_hash, parse_file_bytes
+
+
+class NamedBytes(io.BytesIO):
+    """Stands in for the UploadedFile objects st.file_uploader returns."""
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+class NullProgress:
+    def progress(self, value, text=None):
+        pass
+
+
+def make_file(rows, seed):
+    """Build one daily store export as CSV bytes."""
+    rng = np.random.default_rng(seed)
+    price = np.round(rng.uniform(1, 500, size=rows), 2)
+    quantity = rng.integers(1, 20, size=rows)
+    total = price * quantity
+    return pd.DataFrame({
+        'SKU': rng.integers(0, 5_000, size=rows).astype(str),
+        'Price': price,
+        'Quantity': quantity,
+        'Total': total,
+        'Profit': np.round(total * rng.uniform(0.05, 0.4, size=rows), 2),
+        'Margin': rng.integers(5, 40, size=rows),
+    }).to_csv(index=False).encode('utf-8')
+
+
+def serial(files):
+    rename_items = tuple(FRENCH_COLUMN_RENAMES.items())
+    for uploaded_file in files:
+        parse_file_bytes(uploaded_file.getvalue(), 'csv', rename_items)
+
+
+def parallel(files, workers):
+    """
+    The process_files path: parse in the pool, then read every file back
+    from the store, parsing in-process whatever the pool did not handle.
+    """
+    rename_items = tuple(FRENCH_COLUMN_RENAMES.items())
+    # Each run writes to a fresh store so no file is skipped as already parsed
+    with tempfile.TemporaryDirectory() as store:
+        data_processor.DATASET_STORE_DIR = store
+        data_processor._ingest_in_parallel(files, NullProgress(), workers)
+        for uploaded_file in files:
+            file_bytes = uploaded_file.getvalue()
+            if data_processor._read_stored_dataset(content_hash(file_bytes)) is None:
+                parse_file_bytes(file_bytes, 'csv', rename_items)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=8)
+    parser.add_argument('--rows', type=int, default=200_000, help="Rows per file")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    payloads = [make_file(args.rows, seed) for seed in range(args.files)]
+    megabytes = len(payloads[0]) / 1e6
+    print(f"rows per file: {args.rows:,} ({megabytes:.1f} MB), workers: {args.workers}")
+    print(f"{'files':>5}  {'serial s':>9}  {'pool s':>9}  {'serial MB/s':>11}  {'pool MB/s':>10}")
+    for count in range(1, args.files + 1):
+        files = [NamedBytes(payload, f'day{position}.csv') for position, payload in enumerate(payloads[:count])]
+        serial_time = timed(serial, files)
+        parallel_time = timed(parallel, files, args.workers)
+        size = megabytes * count
+        print(
+            f"{count:>5}  {serial_time:>9.2f}  {parallel_time:>9.2f}  "
+            f"{size / serial_time:>11.1f}  {size / parallel_time:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
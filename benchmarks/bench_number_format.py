@@ -0,0 +1,76 @@
+"""
+Compare the vectorized number formatting against the old per-value paths.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_number_format --values 100000
+"""
+import argparse
+import locale
+import time
+
+import numpy as np
+
+from utils.number_format import format_numbers
+from utils.translator import Translator
+
+
+def format_metric(value, metric_type):
+    """
+    The per-value formatting the top products cards used before.
+    """
+    try:
+        numeric_value = float(value)
+        if metric_type == "currency":
+            formatted = f"{numeric_value:.2f}"
+        elif metric_type == "quantity":
+            formatted = f"{numeric_value:.0f}"
+        else:
+            formatted = f"{numeric_value}"
+        parts = formatted.split(".")
+        parts[0] = "{:,}".format(int(float(parts[0]))).replace(",", " ")
+        formatted = ".".join(parts)
+        if metric_type == "currency":
+            return formatted + " Dhs"
+        return formatted
+    except ValueError:
+        return str(value)
+
+
+def format_locale(value):
+    """
+    The locale-based formatting of format_all_currencies before.
+    """
+    return locale.format_string("%.2f Dhs", value, grouping=True)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--values', type=int, default=100_000)
+    args = parser.parse_args()
+
+    translator = Translator()
+    translations = {key: translator.get_translation('English', key) for key in translator.translations['English']}
+    values = np.round(np.random.default_rng(0).lognormal(6, 2, size=args.values), 2)
+
+    legacy, legacy_time = timed(lambda: [format_metric(value, 'currency') for value in values])
+    _, locale_time = timed(lambda: [format_locale(value) for value in values])
+    vectorized, vectorized_time = timed(format_numbers, values, translations, 'currency')
+
+    mismatches = sum(old != new for old, new in zip(legacy, vectorized))
+    print(f"values:             {args.values:,}")
+    print(f"format_metric:      {legacy_time:.3f}s")
+    print(f"locale.format:      {locale_time:.3f}s")
+    print(f"format_numbers:     {vectorized_time:.3f}s")
+    print(f"speedup:            {legacy_time / vectorized_time:.1f}x over format_metric")
+    print(f"mismatches:         {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare the vectorized numeric cleaning against the old per-cell path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_numeric_cleaning --rows 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_processor import clean_numeric_column
+
+
+def convert_to_float(value):
+    """
+    The per-cell conversion that app.py used to run through Series.apply.
+    The st.error calls are replaced by a no-op so the timing only covers
+    the conversion itself.
+    """
+    if isinstance(value, (int, float)):
+        return value
+    if pd.isnull(value):
+        return 0.0
+    if value in ['Non Numérique', '', 'nan', 'NaN']:
+        return 0.0
+    if isinstance(value, str):
+        for char in [',', '%', '$', '€', '£', 'Dhs']:
+            value = value.replace(char, '')
+        try:
+            return float(value.strip())
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
+def make_column(rows, dirty_fraction, seed=0):
+    """
+    Build a string column of prices where a fraction of the cells carry
+    currency symbols, sentinels or garbage.
+    """
+    rng = np.random.default_rng(seed)
+    values = np.round(rng.uniform(1, 500, size=rows), 2).astype(str).astype(object)
+    dirty = rng.random(rows) < dirty_fraction
+    variants = np.array(['{} Dhs', '{} €', '$ {}', '{}%', 'Non Numérique', 'n/a', ''], dtype=object)
+    choice = rng.integers(0, len(variants), size=dirty.sum())
+    values[dirty] = [variants[c].format(v) for c, v in zip(choice, values[dirty])]
+    return pd.Series(values, dtype=object)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--dirty', type=float, default=0.05, help="Fraction of cells that need stripping")
+    args = parser.parse_args()
+
+    column = make_column(args.rows, args.dirty)
+
+    legacy, legacy_time = timed(lambda c: c.apply(convert_to_float), column)
+    (vectorized, errors), vectorized_time = timed(clean_numeric_column, column)
+
+    if not np.allclose(legacy.astype(float).fillna(0).to_numpy(), vectorized.to_numpy()):
+        raise SystemExit("Vectorized cleaning does not match the per-cell path")
+
+    print(f"rows:             {args.rows:,}")
+    print(f"apply path:       {legacy_time:.3f}s")
+    print(f"vectorized path:  {vectorized_time:.3f}s")
+    print(f"speedup:          {legacy_time / vectorized_time:.1f}x")
+    print(f"error summary:    {errors}")
+
+
+if __name__ == "__main__":
+    main()
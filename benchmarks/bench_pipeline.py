@@ -0,0 +1,206 @@
+"""
+Time each stage of the dashboard pipeline on synthetic data and append the
+results as JSON lines, so runs can be compared over time.
+
+Every combination of --rows and --skus is generated once and each stage is
+timed --repeat times. Streamlit caches are cleared before every timing, so
+the numbers are cold-path costs.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pipeline --rows 1000 100000 1000000 --skus 10 1000 100000
+"""
+import argparse
+import datetime
+import io
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+import matplotlib
+from streamlit.logger import set_log_level
+
+matplotlib.use('Agg')
+set_log_level('ERROR')
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from aggregations import (
+    RANKING_METRICS,
+    SkuIndex,
+    TimeRollups,
+    compute_sku_rollup,
+    downsample_periods,
+    kpis_from_sku_aggregates,
+    reduce_sku_rollup,
+    top_k_positions,
+)
+from benchmarks.synthetic import make_sales_csv
+from components.exports import write_csv_gzip
+from components.graphs import figure_to_png
+from data_processor import FRENCH_COLUMN_RENAMES, clean_numeric_columns, parse_file_bytes
+from tabs.analysis import draw_margin_analysis_chart, draw_price_quantity_chart, draw_top_selling_chart
+from tabs.overview import (
+    draw_profit_margin_chart,
+    draw_profitability_chart,
+    draw_sales_over_time_chart,
+    draw_sales_trend_chart,
+    draw_unit_price_distribution_chart,
+)
+from utils.dates import DATE_COLUMN, parse_dates
+
+# SKUs drawn per chart and listed per ranking, as in the dashboard defaults
+CHART_SKUS = 20
+TOP_PRODUCTS = 10
+TREND_SKUS = 5
+TREND_MAX_POINTS = 366
+
+
+def build_sku_index(skus):
+    """
+    Builds a SkuIndex with its row order, which SkuIndex otherwise defers
+    to the first filter, so the whole build is timed as one stage.
+    """
+    index = SkuIndex(skus)
+    index.positions([])
+    return index
+
+
+def pipeline_stages(csv_bytes):
+    """
+    Build the stages to time for one synthetic file, in pipeline order.
+
+    Returns:
+    - A list of (stage name, function) pairs. Inputs each stage needs are
+      computed once up front so only the stage itself is timed.
+    """
+    rename_items = tuple(FRENCH_COLUMN_RENAMES.items())
+    raw = pd.read_csv(io.BytesIO(csv_bytes)).rename(columns=dict(rename_items))
+    data, _ = parse_file_bytes(csv_bytes, 'csv', rename_items)
+    index = build_sku_index(data['SKU'])
+    rollup = compute_sku_rollup(data)
+    selected = list(index.categories[:10])
+    top_profit = rollup.index[top_k_positions(rollup['Profit'].to_numpy(), TOP_PRODUCTS)].tolist()
+    top_selling = rollup['Quantity'].iloc[top_k_positions(rollup['Quantity'].to_numpy(), TOP_PRODUCTS)]
+
+    stages = [
+        ('read_csv', lambda: pd.read_csv(io.BytesIO(csv_bytes))),
+        ('numeric_cleaning', lambda: clean_numeric_columns(raw.copy())),
+        ('process_data', lambda: parse_file_bytes(csv_bytes, 'csv', rename_items)),
+        ('sku_index', lambda: build_sku_index(data['SKU'])),
+        ('sku_filter', lambda: index.filter(data, selected)),
+        ('sku_rollup', lambda: compute_sku_rollup(data)),
+        ('kpis', lambda: kpis_from_sku_aggregates(rollup)),
+        ('top_products', lambda: [top_k_positions(rollup[metric].to_numpy(), TOP_PRODUCTS) for metric in RANKING_METRICS]),
+        ('reduce_rollup', lambda: reduce_sku_rollup(rollup, 'Total', CHART_SKUS)),
+        ('chart_unit_price_distribution', lambda: figure_to_png(
+            draw_unit_price_distribution_chart(data['Price'], 'Unit Price Distribution')
+        )),
+        ('chart_profit_margin_by_sku', lambda: figure_to_png(
+            draw_profit_margin_chart(reduce_sku_rollup(rollup, 'Margin', CHART_SKUS), 'Profit Margin by SKU')
+        )),
+        ('chart_sales_by_sku', lambda: figure_to_png(
+            draw_sales_over_time_chart(reduce_sku_rollup(rollup, 'Total', CHART_SKUS))
+        )),
+        ('chart_profitability', lambda: figure_to_png(draw_profitability_chart(rollup, top_profit))),
+        ('chart_margin_analysis', lambda: figure_to_png(draw_margin_analysis_chart(data['Margin']))),
+        ('chart_price_quantity', lambda: figure_to_png(draw_price_quantity_chart(data))),
+        ('chart_top_selling', lambda: figure_to_png(draw_top_selling_chart(top_selling, 'Quantity', 'SKU'))),
+        ('export_csv_gzip', lambda: write_csv_gzip(data, io.BytesIO())),
+    ]
+    if DATE_COLUMN in raw.columns:
+        time_rollups = TimeRollups(data)
+        top_total = rollup.index[top_k_positions(rollup['Total'].to_numpy(), TREND_SKUS)].tolist()
+
+        def draw_trend(grain):
+            overall, _ = downsample_periods(time_rollups.overall(grain)['Total'], TREND_MAX_POINTS)
+            per_sku, _ = downsample_periods(time_rollups.per_sku(grain, top_total, 'Total'), TREND_MAX_POINTS)
+            return figure_to_png(draw_sales_trend_chart(overall, per_sku, 'Total', 'All products'))
+
+        stages += [
+            ('date_parse', lambda: parse_dates(raw[DATE_COLUMN])),
+            ('time_rollups', lambda: TimeRollups(data)),
+            ('chart_sales_trend_day', lambda: draw_trend('day')),
+            ('chart_sales_trend_month', lambda: draw_trend('month')),
+        ]
+    return stages
+
+
+def time_stage(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        st.cache_resource.clear()
+        st.cache_data.clear()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_metadata():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'run': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--skus', type=int, nargs='+', default=[10, 1_000, 100_000])
+    parser.add_argument('--dirty', type=float, default=0.05, help="Fraction of dirty Price and Total cells")
+    parser.add_argument('--french', action='store_true', help="Use the French column headers")
+    parser.add_argument('--days', type=int, default=730, help="Days of sales in the Date column; 0 for none")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--stages', nargs='+', help="Only time these stages")
+    parser.add_argument('--output', default='benchmark_results.jsonl', help="JSON lines file the results are appended to")
+    args = parser.parse_args()
+
+    metadata = run_metadata()
+    print(f"{'rows':>10} {'skus':>9}  {'stage':<30} {'min s':>8} {'median s':>9} {'rows/s':>12}")
+    with open(args.output, 'a', encoding='utf-8') as results:
+        for rows in args.rows:
+            for skus in args.skus:
+                if skus > rows:
+                    continue
+                csv_bytes = make_sales_csv(rows, skus, args.dirty, args.french, days=args.days)
+                for stage, func in pipeline_stages(csv_bytes):
+                    if args.stages and stage not in args.stages:
+                        continue
+                    timings = time_stage(func, args.repeat)
+                    record = {
+                        **metadata,
+                        'rows': rows,
+                        'skus': skus,
+                        'dirty': args.dirty,
+                        'french': args.french,
+                        'days': args.days,
+                        'file_bytes': len(csv_bytes),
+                        'stage': stage,
+                        'timings': timings,
+                        'min': min(timings),
+                        'median': statistics.median(timings),
+                    }
+                    results.write(json.dumps(record) + '\n')
+                    print(
+                        f"{rows:>10,} {skus:>9,}  {stage:<30} {record['min']:>8.3f} {record['median']:>9.3f} "
+                        f"{rows / record['min']:>12,.0f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
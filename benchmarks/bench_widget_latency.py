@@ -0,0 +1,168 @@
+"""
+Measure the latency of in-tab widget interactions before and after they
+were moved into fragments.
+
+Before, a widget change reran the whole script; that is timed as a full
+AppTest rerun after the change. Now the change only reruns the fragment
+that owns the widget, as the server does: AppTest has no fragment reruns,
+so the run is requested with the widget's fragment id, found in the delta
+messages of a full run, like a widget event from the browser would.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_widget_latency --rows 200000 --skus 5000
+"""
+import argparse
+import contextlib
+import functools
+import os
+import sys
+import tempfile
+import time
+
+from streamlit.runtime.scriptrunner.script_runner import ScriptRunner
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import AppTest, local_script_runner
+
+from benchmarks.synthetic import make_sales_csv
+
+
+def dashboard(repo_root, csv_path):
+    """The dashboard with the file uploader answering with `csv_path`."""
+    import io
+    import os
+    import sys
+
+    import streamlit as st
+
+    sys.path.insert(0, repo_root)
+
+    class Upload(io.BytesIO):
+        name = os.path.basename(csv_path)
+
+    def file_uploader(*args, **kwargs):
+        with open(csv_path, 'rb') as handle:
+            return [Upload(handle.read())]
+
+    st.file_uploader = file_uploader
+    import app
+    app.main()
+
+
+def select_next(widget):
+    options = list(widget.options)
+    return widget.set_value(options[(options.index(str(widget.value)) + 1) % len(options)])
+
+
+# (interaction, tab, key of the widget, widget change)
+INTERACTIONS = [
+    ('top products sort', 'Overview', 'top_products_sort',
+     lambda widget: select_next(widget)),
+    ('profitability selection', 'Overview', 'profitability_skus',
+     lambda widget: widget.unselect(widget.value[-1])),
+    ('margin chart SKU count', 'Overview', 'profit_margin_chart_skus',
+     lambda widget: widget.set_value(widget.value + 5)),
+    ('data table page', 'Data View', 'data_view_page',
+     lambda widget: widget.increment()),
+]
+
+
+class FragmentIds:
+    """
+    Records the fragment id of every widget the script runners send, by
+    widget id, while the block runs.
+    """
+    def __init__(self):
+        self.by_widget = {}
+
+    def __enter__(self):
+        self._enqueue = ScriptRunner._enqueue_forward_msg
+        recorder = self
+
+        def enqueue(runner, msg):
+            if msg.HasField('delta') and msg.delta.fragment_id and msg.delta.HasField('new_element'):
+                element = msg.delta.new_element
+                widget_id = getattr(getattr(element, element.WhichOneof('type')), 'id', None)
+                if widget_id:
+                    recorder.by_widget[widget_id] = msg.delta.fragment_id
+            recorder._enqueue(runner, msg)
+
+        ScriptRunner._enqueue_forward_msg = enqueue
+        return self
+
+    def __exit__(self, *exc_info):
+        ScriptRunner._enqueue_forward_msg = self._enqueue
+
+
+@contextlib.contextmanager
+def fragment_rerun(fragment_id):
+    """Makes the AppTest runs inside the block rerun only `fragment_id`."""
+    rerun_data = local_script_runner.RerunData
+    local_script_runner.RerunData = functools.partial(RerunData, fragment_id=fragment_id)
+    try:
+        yield
+    finally:
+        local_script_runner.RerunData = rerun_data
+
+
+def widget(at, tab, key):
+    if at.session_state['active_tab'] != tab:
+        at.session_state['active_tab'] = tab
+        at.run()
+    return next(element for element in at.main if getattr(element, 'key', None) == key)
+
+
+def time_full_rerun(at, tab, key, change):
+    change(widget(at, tab, key))
+    start = time.perf_counter()
+    at.run()
+    return time.perf_counter() - start
+
+
+def time_fragment_rerun(at, tab, key, change):
+    with FragmentIds() as fragments:
+        target = widget(at, tab, key)
+        at.run()
+    target = widget(at, tab, key)
+    fragment_id = fragments.by_widget[target.id]
+    change(target)
+    # The fragment run only sends the fragment's elements; the rest of the
+    # page, with the changed widget, stays as the full run left it
+    tree = at._tree
+    with fragment_rerun(fragment_id):
+        start = time.perf_counter()
+        at.run()
+        seconds = time.perf_counter() - start
+    if at.exception:
+        sys.exit(at.exception[0].message)
+    at._tree = tree
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--skus', type=int, default=5_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'sales.csv')
+        with open(csv_path, 'wb') as handle:
+            handle.write(make_sales_csv(args.rows, args.skus))
+
+        at = AppTest.from_function(dashboard, args=(os.getcwd(), csv_path), default_timeout=600)
+        at.run()
+        if at.exception:
+            sys.exit(at.exception[0].message)
+
+        print(f"rows: {args.rows:,}, SKUs: {args.skus:,}")
+        print(f"{'interaction':<26} {'full rerun s':>13} {'fragment s':>11} {'speedup':>8}")
+        for name, tab, key, change in INTERACTIONS:
+            full = [time_full_rerun(at, tab, key, change) for _ in range(args.repeat)]
+            fragment = [time_fragment_rerun(at, tab, key, change) for _ in range(args.repeat)]
+            best_full, best_fragment = min(full), min(fragment)
+            print(f"{name:<26} {best_full:>13.3f} {best_fragment:>11.3f} {best_full / best_fragment:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
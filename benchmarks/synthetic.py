@@ -0,0 +1,121 @@
+"""
+Generate synthetic sales files with the dashboard's schema.
+
+Run from the repository root:
+
+    python -m benchmarks.synthetic sales_1m.csv --rows 1000000 --skus 50000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from data_processor import FRENCH_COLUMN_RENAMES
+
+# Formats applied to the dirty fraction of the Price and Total cells
+DIRTY_FORMATS = ['{:,.2f} Dhs', '€ {:.2f}', '$ {:,.2f}', '{:.2f} %', ' {:.2f} ']
+
+# Cells that hold no number at all
+DIRTY_SENTINELS = ['Non Numérique', '', 'n/a']
+
+# Most recent sale date of the synthetic files
+SYNTHETIC_LAST_DAY = '2025-12-31'
+
+
+def _dirty(values, fraction, rng):
+    """
+    Turn a fraction of a float column into strings with currency symbols,
+    thousands separators, percent signs or no number at all.
+    """
+    dirty = np.flatnonzero(rng.random(len(values)) < fraction)
+    if len(dirty) == 0:
+        return values
+    column = values.astype(object)
+    formats = DIRTY_FORMATS + DIRTY_SENTINELS
+    choice = rng.integers(0, len(formats), size=len(dirty))
+    column[dirty] = [formats[c].format(v) for c, v in zip(choice, values[dirty])]
+    return column
+
+
+def make_sales_data(rows, skus, dirty=0.05, french=False, seed=0, days=0):
+    """
+    Build a sales DataFrame with SKU, Name, Price, Quantity, Total, Profit
+    and Margin columns, and a day-first Date column when `days` is set.
+
+    SKU popularity follows a Zipf-like curve, so a few SKUs carry most rows
+    as in real exports. Total is Price times Quantity and Profit is Total
+    times Margin.
+
+    Parameters:
+    - rows: The number of rows.
+    - skus: The number of distinct SKUs.
+    - dirty: The fraction of Price and Total cells written as dirty strings.
+    - french: Use the French column headers that process_data renames.
+    - seed: The random seed.
+    - days: The number of days the sales are spread over, ending on
+      SYNTHETIC_LAST_DAY; 0 for no Date column.
+
+    Returns:
+    - A DataFrame.
+    """
+    rng = np.random.default_rng(seed)
+    skus = max(1, min(skus, rows))
+    weights = 1.0 / np.arange(1, skus + 1)
+    codes = rng.choice(skus, size=rows, p=weights / weights.sum())
+    # Every SKU appears at least once
+    codes[rng.permutation(rows)[:skus]] = np.arange(skus)
+
+    labels = pd.Index([f'SKU-{position:07d}' for position in range(skus)])
+    names = pd.Index([f'Product {position}' for position in range(skus)])
+    catalog_price = np.round(rng.lognormal(3, 1, size=skus), 2)
+
+    price = catalog_price[codes]
+    quantity = rng.integers(1, 50, size=rows)
+    margin = np.round(rng.uniform(0, 40, size=rows), 1)
+    total = np.round(price * quantity, 2)
+    data = pd.DataFrame({
+        'SKU': pd.Categorical.from_codes(codes, labels),
+        'Name': pd.Categorical.from_codes(codes, names),
+        'Price': _dirty(price, dirty, rng),
+        'Quantity': quantity,
+        'Total': _dirty(total, dirty, rng),
+        'Profit': np.round(total * margin / 100, 2),
+        'Margin': margin,
+    })
+    if days:
+        # Drawn last, so the other columns are the same with or without dates
+        offsets = pd.to_timedelta(rng.integers(0, days, size=rows), unit='D')
+        data.insert(0, 'Date', (pd.Timestamp(SYNTHETIC_LAST_DAY) - offsets).strftime('%d/%m/%Y'))
+    if french:
+        data = data.rename(columns={renamed: original for original, renamed in FRENCH_COLUMN_RENAMES.items()})
+    return data
+
+
+def make_sales_csv(rows, skus, dirty=0.05, french=False, seed=0, days=0):
+    """
+    Build a synthetic sales file as CSV bytes; see make_sales_data.
+    """
+    return make_sales_data(rows, skus, dirty, french, seed, days).to_csv(index=False).encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('path', help="Output file, .csv or .xlsx")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--skus', type=int, default=1_000)
+    parser.add_argument('--dirty', type=float, default=0.05, help="Fraction of dirty Price and Total cells")
+    parser.add_argument('--french', action='store_true', help="Use the French column headers")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--days', type=int, default=0, help="Days of sales in a Date column; 0 for none")
+    args = parser.parse_args()
+
+    data = make_sales_data(args.rows, args.skus, args.dirty, args.french, args.seed, args.days)
+    if args.path.endswith('.xlsx'):
+        data.to_excel(args.path, index=False)
+    else:
+        data.to_csv(args.path, index=False)
+    print(f"wrote {len(data):,} rows and {data.iloc[:, 1 if args.days else 0].nunique():,} SKUs to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
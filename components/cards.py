@@ -1,5 +1,78 @@
+import html
+
 import streamlit as st
 
+from utils.css_injector import register_stylesheet
+
+# The card styles are injected once per rerun by add_custom_css, not per card
+register_stylesheet('cards', 'static/cards.css')
+
+# Card templates, filled with str.format. Each is a single line, so a row of
+# cards stays one raw HTML block for the markdown renderer.
+CARD_TEMPLATE = '<div class="info-card info-card-{style}"><h4>{title}</h4><p>{content}</p></div>'
+STATISTIC_CARD_TEMPLATE = (
+    '<div class="statistic-card statistic-card-{style}"><h3>{value}</h3><p>{label}</p></div>'
+)
+METRIC_CARD_TEMPLATE = (
+    '<div class="metric-container"><p class="metric-title"><span class="rank-symbol">{symbol}</span>{title}</p>'
+    '<div class="row">{metrics}</div></div>'
+)
+METRIC_TEMPLATE = '<div class="col"><p class="metric-value">{value}</p><p class="metric-label">{label}</p></div>'
+
+CARD_STYLES = ("info", "success", "warning", "danger")
+
+# Symbols shown before the title of the first three ranks
+RANK_SYMBOLS = {
+    1: "🥇",
+    2: "🥈",
+    3: "🥉"
+}
+
+
+def card_html(title, content, style="info"):
+    """
+    Returns the HTML of an information card; see create_card.
+    """
+    style = style if style in CARD_STYLES else "info"
+    return CARD_TEMPLATE.format(title=title, content=content, style=style)
+
+
+def statistic_card_html(label, value, style="primary"):
+    """
+    Returns the HTML of a statistic card; see create_statistic_card.
+    """
+    style = "secondary" if style == "secondary" else "primary"
+    return STATISTIC_CARD_TEMPLATE.format(label=label, value=value, style=style)
+
+
+def metric_card_html(title, metrics, rank=None):
+    """
+    Returns the HTML of a card with several metrics under one title.
+
+    Parameters:
+    - title: The title of the card; escaped, since it usually comes from
+      the data.
+    - metrics: (value, label) pairs, shown in order.
+    - rank: The rank of the card; the first three get a medal.
+    """
+    return METRIC_CARD_TEMPLATE.format(
+        symbol=RANK_SYMBOLS.get(rank, ""),
+        title=html.escape(str(title)),
+        metrics=''.join(METRIC_TEMPLATE.format(value=value, label=label) for value, label in metrics),
+    )
+
+
+def render_card_row(cards):
+    """
+    Renders the HTML of several cards as a single element, laid out three
+    per row; one delta message instead of one per card and column.
+
+    Parameters:
+    - cards: The HTML of each card, from the *_card_html functions.
+    """
+    st.markdown(f'<div class="card-row">{"".join(cards)}</div>', unsafe_allow_html=True)
+
+
 def create_card(title, content, style="info"):
     """
     Creates a stylized card component for the Streamlit dashboard.
@@ -9,27 +82,7 @@ def create_card(title, content, style="info"):
     - content: The main content to display on the card.
     - style: Style of the card (e.g., 'info', 'success', 'warning', 'danger').
     """
-
-    card_color = {
-        "info": "#117a8b",
-        "success": "#28a745",
-        "warning": "#ffc107",
-        "danger": "#dc3545"
-    }
-
-    card_html = f"""
-        <div style="
-            border-left: 5px solid {card_color.get(style, '#117a8b')};
-            background-color: #f4f4f4;
-            padding: 15px 20px;
-            border-radius: 5px;
-            margin: 10px 0px;
-            box-shadow: 2px 2px 2px rgba(0,0,0,0.1);">
-            <h4 style="color: {card_color.get(style, '#117a8b')}; margin:0;">{title}</h4>
-            <p style="margin:5px 0px;">{content}</p>
-        </div>
-    """
-    st.markdown(card_html, unsafe_allow_html=True)
+    st.markdown(card_html(title, content, style), unsafe_allow_html=True)
 
 def create_statistic_card(label, value, style="primary"):
     """
@@ -40,31 +93,16 @@ def create_statistic_card(label, value, style="primary"):
     - value: Value of the statistic.
     - style: Style of the card (e.g., 'primary', 'secondary').
     """
-
-    bg_color = "#f8f9fa" if style == "secondary" else "#ffffff"
-    text_color = "#6c757d" if style == "secondary" else "#000000"
-
-    card_html = f"""
-        <div style="
-            background-color: {bg_color};
-            padding: 10px 15px;
-            border-radius: 5px;
-            border: 1px solid #ddd;
-            text-align: center;
-            margin: 10px 0px;
-            box-shadow: 1px 1px 3px rgba(0,0,0,0.1);">
-            <h3 style="color: {text_color}; margin:0;">{value}</h3>
-            <p style="color: {text_color}; margin:5px 0px;">{label}</p>
-        </div>
-    """
-    st.markdown(card_html, unsafe_allow_html=True)
+    st.markdown(statistic_card_html(label, value, style), unsafe_allow_html=True)
 
 # Example usage of the card components
 def example_usage():
     create_card("Notice", "This is an informational card.", style="info")
     create_card("Warning", "Please check your input.", style="warning")
-    create_statistic_card("Total Sales", "$1,234", style="primary")
-    create_statistic_card("Active Users", "456", style="secondary")
+    render_card_row([
+        statistic_card_html("Total Sales", "$1,234", style="primary"),
+        statistic_card_html("Active Users", "456", style="secondary"),
+    ])
 
 # Uncomment the line below to test the example usage in your app.
 # example_usage()
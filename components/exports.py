@@ -0,0 +1,112 @@
+import gzip
+import io
+
+import pyarrow as pa
+import streamlit as st
+from utils.fingerprint import fingerprint
+
+# Rows serialized at a time, so no full-size text copy of the data is built
+EXPORT_CHUNK_ROWS = 100_000
+
+# Data rows per worksheet; Excel sheets hold 1,048,576 rows including the header
+XLSX_MAX_ROWS = 1_048_575
+
+# Download formats: label -> (file extension, mime type)
+EXPORT_FORMATS = {
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def _chunks(data, rows=EXPORT_CHUNK_ROWS):
+    for start in range(0, len(data), rows):
+        yield data.iloc[start:start + rows]
+
+
+def write_csv_gzip(data, stream):
+    """
+    Writes `data` to a binary stream as gzip-compressed CSV, one chunk of
+    rows at a time.
+    """
+    with gzip.GzipFile(fileobj=stream, mode='wb') as compressed:
+        compressed.write(data.iloc[:0].to_csv(index=False).encode('utf-8'))
+        for chunk in _chunks(data):
+            compressed.write(chunk.to_csv(index=False, header=False).encode('utf-8'))
+
+
+def write_parquet(data, stream):
+    """
+    Writes `data` to a binary stream as Parquet, one row group per chunk.
+    """
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(data, preserve_index=False)
+    with pq.ParquetWriter(stream, schema) as writer:
+        for chunk in _chunks(data):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def write_xlsx(data, stream):
+    """
+    Writes `data` to a binary stream as an Excel workbook using openpyxl's
+    write-only mode, continuing on a new sheet whenever one is full.
+    """
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    header = [str(column) for column in data.columns]
+    sheet = None
+    for start in range(0, max(len(data), 1), XLSX_MAX_ROWS):
+        sheet = workbook.create_sheet(f"Sheet{start // XLSX_MAX_ROWS + 1}")
+        sheet.append(header)
+        for chunk in _chunks(data.iloc[start:start + XLSX_MAX_ROWS]):
+            chunk = chunk.astype(object).where(chunk.notna(), None)
+            for row in chunk.itertuples(index=False, name=None):
+                sheet.append(row)
+    workbook.save(stream)
+
+
+_WRITERS = {
+    "CSV (gzip)": write_csv_gzip,
+    "Parquet": write_parquet,
+    "Excel": write_xlsx,
+}
+
+
+@st.cache_resource(show_spinner=False, max_entries=6)
+def _cached_export(data_fingerprint, export_format, _data):
+    stream = io.BytesIO()
+    _WRITERS[export_format](_data, stream)
+    return stream.getvalue()
+
+
+def export_bytes(data, export_format):
+    """
+    Returns the contents of `data` serialized in one of EXPORT_FORMATS.
+    Exports are cached per data fingerprint and format, so repeated
+    downloads of unchanged data are not serialized again.
+    """
+    return _cached_export(fingerprint(data), export_format, data)
+
+
+def download_controls(data, translations, file_stem, key):
+    """
+    Shows a format picker and a download button. The export is only built
+    when the button is clicked, never on a plain rerun.
+
+    Parameters:
+    - data: The DataFrame to export.
+    - translations: A dictionary containing translation mappings for text.
+    - file_stem: The downloaded file name, without extension.
+    - key: A unique key prefix for the widgets.
+    """
+    export_format = st.selectbox(translations["export_format"], list(EXPORT_FORMATS), key=f"{key}-format")
+    extension, mime = EXPORT_FORMATS[export_format]
+    st.download_button(
+        label=translations["download_data"],
+        data=lambda: export_bytes(data, export_format),
+        file_name=f"{file_stem}.{extension}",
+        mime=mime,
+        key=key
+    )
@@ -1,7 +1,115 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import streamlit as st
 import pandas as pd
+from utils import profiling
+from utils.fingerprint import fingerprint
+
+# matplotlib and seaborn are slow to import, so they are imported where a
+# chart is drawn rather than at start-up; utils.warmup preloads them
+
+# Upper bound on the total size of the rendered charts kept in memory
+CHART_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Resolution charts are rendered at, matching st.pyplot's default
+CHART_DPI = 200
+
+# Fine bins per histogram bin used for the binned density estimate
+KDE_BINS_PER_BIN = 25
+
+
+class ChartCache:
+    """
+    A thread-safe LRU cache of rendered chart images, bounded by the total
+    number of bytes it holds rather than by the number of charts.
+    """
+    def __init__(self, max_bytes=CHART_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the cached image bytes for `key`, or None on a miss.
+        """
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def put(self, key, image):
+        """
+        Stores image bytes under `key`, evicting the least recently used
+        charts until the cache fits in `max_bytes`.
+        """
+        if len(image) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._images.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._images[key] = image
+            self.size += len(image)
+            while self.size > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self.size -= len(evicted)
+
+
+@st.cache_resource
+def get_chart_cache():
+    """
+    Returns the chart cache shared by every session in this process.
+    """
+    return ChartCache()
+
+
+def chart_key(chart, data_fingerprint, *params):
+    """
+    Builds the cache key of a chart.
+
+    Parameters:
+    - chart: The name of the chart type.
+    - data_fingerprint: The fingerprint of the data the chart is drawn from.
+    - params: The chart parameters, including every translated label drawn
+      on it so each language is cached separately.
+    """
+    return hashlib.sha256(repr((chart, data_fingerprint, params)).encode('utf-8')).hexdigest()
+
+
+def figure_to_png(fig):
+    """
+    Renders a figure to PNG bytes at CHART_DPI and closes it.
+    """
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=CHART_DPI, bbox_inches='tight')
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def render_chart(key, draw):
+    """
+    Shows a chart in the Streamlit app, drawing it only if it is not cached.
+
+    Parameters:
+    - key: The cache key built with chart_key.
+    - draw: A function that draws the chart and returns its figure. It is
+      only called on a cache miss.
+    """
+    cache = get_chart_cache()
+    image = cache.get(key)
+    if image is None:
+        with profiling.stage('matplotlib render'):
+            image = figure_to_png(draw())
+        cache.put(key, image)
+    st.image(image, width='stretch')
 
 def line_chart(data, x, y, title=None, xlabel=None, ylabel=None):
     """
@@ -15,13 +123,19 @@ def line_chart(data, x, y, title=None, xlabel=None, ylabel=None):
     - xlabel: Label for the x-axis (optional).
     - ylabel: Label for the y-axis (optional).
     """
-    plt.figure(figsize=(10, 6))
-    sns.lineplot(data=data, x=x, y=y)
-    plt.title(title)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    plt.tight_layout()
-    st.pyplot(plt)
+    def draw():
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        plt.figure(figsize=(10, 6))
+        sns.lineplot(data=data, x=x, y=y)
+        plt.title(title)
+        plt.xlabel(xlabel)
+        plt.ylabel(ylabel)
+        plt.tight_layout()
+        return plt.gcf()
+
+    render_chart(chart_key('line_chart', fingerprint(data), x, y, title, xlabel, ylabel), draw)
 
 def bar_chart(data, x, y, title=None, xlabel=None, ylabel=None):
     """
@@ -35,13 +149,19 @@ def bar_chart(data, x, y, title=None, xlabel=None, ylabel=None):
     - xlabel: Label for the x-axis (optional).
     - ylabel: Label for the y-axis (optional).
     """
-    plt.figure(figsize=(10, 6))
-    sns.barplot(data=data, x=x, y=y)
-    plt.title(title)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    plt.tight_layout()
-    st.pyplot(plt)
+    def draw():
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        plt.figure(figsize=(10, 6))
+        sns.barplot(data=data, x=x, y=y)
+        plt.title(title)
+        plt.xlabel(xlabel)
+        plt.ylabel(ylabel)
+        plt.tight_layout()
+        return plt.gcf()
+
+    render_chart(chart_key('bar_chart', fingerprint(data), x, y, title, xlabel, ylabel), draw)
 
 def scatter_plot(data, x, y, hue=None, title=None, xlabel=None, ylabel=None):
     """
@@ -56,13 +176,19 @@ def scatter_plot(data, x, y, hue=None, title=None, xlabel=None, ylabel=None):
     - xlabel: Label for the x-axis (optional).
     - ylabel: Label for the y-axis (optional).
     """
-    plt.figure(figsize=(10, 6))
-    sns.scatterplot(data=data, x=x, y=y, hue=hue)
-    plt.title(title)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    plt.tight_layout()
-    st.pyplot(plt)
+    def draw():
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        plt.figure(figsize=(10, 6))
+        sns.scatterplot(data=data, x=x, y=y, hue=hue)
+        plt.title(title)
+        plt.xlabel(xlabel)
+        plt.ylabel(ylabel)
+        plt.tight_layout()
+        return plt.gcf()
+
+    render_chart(chart_key('scatter_plot', fingerprint(data), x, y, hue, title, xlabel, ylabel), draw)
 
 def histogram(data, column, bins=20, title=None, xlabel=None):
     """
@@ -75,12 +201,98 @@ def histogram(data, column, bins=20, title=None, xlabel=None):
     - title: Title of the histogram (optional).
     - xlabel: Label for the x-axis (optional).
     """
-    plt.figure(figsize=(10, 6))
-    sns.histplot(data[column], bins=bins)
-    plt.title(title)
-    plt.xlabel(xlabel)
-    plt.tight_layout()
-    st.pyplot(plt)
+    def draw():
+        import matplotlib.pyplot as plt
+
+        plt.figure(figsize=(10, 6))
+        histogram_with_kde(plt.gca(), data[column], bins=bins, kde=False)
+        plt.title(title)
+        plt.xlabel(xlabel)
+        plt.tight_layout()
+        return plt.gcf()
+
+    render_chart(chart_key('histogram', fingerprint(data), column, bins, title, xlabel), draw)
+
+def binned_distribution(values, bins=20, bins_per_bin=KDE_BINS_PER_BIN):
+    """
+    Computes a histogram and a Gaussian kernel density estimate of a column
+    from a single binning pass over the data.
+
+    The values are counted once into `bins * bins_per_bin` fine bins. The
+    histogram is the sum of each run of fine bins, and the density is the
+    fine counts convolved with a Gaussian kernel, using Scott's bandwidth
+    like seaborn. Everything after the binning pass works on the fine bins
+    only, so the cost does not grow with the number of rows.
+
+    Parameters:
+    - values: The values to summarize; NaN and infinite values are ignored.
+    - bins: Number of histogram bins.
+    - bins_per_bin: Number of fine bins per histogram bin.
+
+    Returns:
+    - A tuple (edges, counts, grid, density). `density` is scaled to counts
+      per histogram bin so it overlays the bars, as sns.histplot(kde=True)
+      does, and is None when there are too few distinct values for a KDE.
+    """
+    values = np.asarray(values, dtype='float64')
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return np.linspace(0, 1, bins + 1), np.zeros(bins), None, None
+
+    low, high = values.min(), values.max()
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    fine_counts, fine_edges = np.histogram(values, bins=bins * bins_per_bin, range=(low, high))
+    counts = fine_counts.reshape(bins, bins_per_bin).sum(axis=1)
+    edges = fine_edges[::bins_per_bin]
+
+    grid = (fine_edges[:-1] + fine_edges[1:]) / 2
+    total = len(values)
+    mean = (fine_counts * grid).sum() / total
+    variance = (fine_counts * (grid - mean) ** 2).sum() / max(total - 1, 1)
+    bandwidth = np.sqrt(variance) * total ** (-1 / 5)
+    if bandwidth <= 0:
+        return edges, counts, None, None
+
+    step = grid[1] - grid[0]
+    half_width = int(min(np.ceil(4 * bandwidth / step), len(grid) - 1))
+    kernel = np.exp(-0.5 * (np.arange(-half_width, half_width + 1) * step / bandwidth) ** 2)
+    smoothed = np.convolve(fine_counts, kernel)[half_width:half_width + len(grid)]
+    density = smoothed / (total * bandwidth * np.sqrt(2 * np.pi))
+    return edges, counts, grid, density * total * (edges[1] - edges[0])
+
+
+def histogram_with_kde(ax, values, bins=20, kde=True, xlabel=None):
+    """
+    Draws a histogram, and optionally its density curve, from binned_distribution
+    on the given axes, styled like sns.histplot.
+
+    Parameters:
+    - ax: The matplotlib axes to draw on.
+    - values: A pandas Series or array of values.
+    - bins: Number of histogram bins.
+    - kde: Whether to overlay the kernel density estimate.
+    - xlabel: Label for the x-axis; defaults to the Series name.
+    """
+    import matplotlib as mpl
+    import seaborn as sns
+    from matplotlib.colors import to_rgba
+
+    edges, counts, grid, density = binned_distribution(values, bins)
+    color = sns.color_palette()[0]
+    ax.bar(
+        edges[:-1],
+        counts,
+        width=np.diff(edges),
+        align='edge',
+        color=to_rgba(color, 0.5 if kde else 0.75),
+        edgecolor=mpl.rcParams['patch.edgecolor'],
+        linewidth=mpl.rcParams['patch.linewidth']
+    )
+    if kde and density is not None:
+        ax.plot(grid, density, color=color)
+    ax.set_xlabel(xlabel if xlabel is not None else getattr(values, 'name', None))
+    ax.set_ylabel('Count')
 
 def convert_df_to_csv(dataframe):
     """
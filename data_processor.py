@@ -1,33 +1,443 @@
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import as_completed
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
 import streamlit as st
+from pandas.api.types import union_categoricals
+
+from aggregations import aggregate_sku_chunk, empty_sku_aggregates, finalize_sku_aggregates, merge_sku_aggregates
+from utils.dates import parse_date_column
+from utils.excel_reader import SHEET_COLUMN, read_excel_sheets
+from utils.fingerprint import append_history, derive_fingerprint, fingerprint, set_append_history, set_fingerprint
+from utils.workers import process_pool
+
+# French export headers and their English equivalents
+FRENCH_COLUMN_RENAMES = {'Produit': 'SKU', 'Quantité': 'Quantity', 'Coût': 'Price', 'Marge': 'Margin'}
+
+# Columns that are converted to numbers after parsing
+NUMERIC_COLUMNS = ['Price', 'Margin', 'Total', 'Profit', 'Quantity']
+
+# Currency symbols, percent signs, thousands separators and whitespace
+NON_NUMERIC_PATTERN = r'Dhs|[,%$€£\s]'
+
+# Values that mean "no number here" and are mapped to 0
+NUMERIC_SENTINELS = ['Non Numérique', '', 'nan', 'NaN']
+
+# Column naming the file each row came from when several files are merged
+SOURCE_COLUMN = 'Source'
+
+# Text columns with few distinct values, stored as categoricals
+CATEGORICAL_COLUMNS = ['SKU', 'Name', SHEET_COLUMN, SOURCE_COLUMN]
+
+# Money and rate columns that are summed into KPIs and rollups; they stay
+# float64, since float32 keeps only about 7 digits and totals would lose cents
+SUMMED_FLOAT_COLUMNS = ['Price', 'Total', 'Profit', 'Margin']
+
+# Columns read by the streaming ingestion mode
+STREAMING_COLUMNS = ['SKU'] + NUMERIC_COLUMNS
+
+# Rows per chunk for the streaming ingestion mode
+STREAMING_CHUNK_SIZE = 200_000
+
+# On-disk store of parsed and cleaned datasets, keyed by content hash
+DATASET_STORE_DIR = '.dataset_store'
+
+# Total size of the dataset store before the oldest datasets are evicted
+DATASET_STORE_MAX_BYTES = 2 * 1024 ** 3
+
+# Set to 1 to let every session reopen any stored dataset, e.g. on a
+# single-user deployment; by default a session only lists its own uploads
+SHARED_DATASETS_ENV = 'DASHBOARD_SHARED_DATASETS'
+
+
+def content_hash(file_bytes):
+    """
+    Compute a stable hash of the raw bytes of an uploaded file.
+
+    Parameters:
+    - file_bytes: The file contents as bytes.
+
+    Returns:
+    - A hex digest string.
+    """
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def clean_numeric_column(column, max_samples=5):
+    """
+    Convert a whole column to numbers in one vectorized pass.
+
+    Integer columns are returned unchanged. Values that already parse as
+    numbers are converted directly; only the remaining cells have currency
+    symbols and separators stripped. Missing
+    values and the 'Non Numérique' sentinels become 0, as do values that
+    still cannot be converted.
+
+    Parameters:
+    - column: The pandas Series to convert.
+    - max_samples: How many offending values to keep in the error summary.
+
+    Returns:
+    - A tuple (cleaned numeric Series, error summary). The summary is None when
+      every value converted, otherwise a dict with the 'count' of failures
+      and a list of 'samples'.
+    """
+    if pd.api.types.is_integer_dtype(column):
+        return column, None
+    if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+        return column.astype('float64').fillna(0.0), None
+
+    numeric = pd.to_numeric(column, errors='coerce').astype('float64')
+    pending = numeric.isna() & column.notna()
+    errors = None
+    if pending.any():
+        raw = column[pending].astype(str)
+        raw = raw[~raw.str.strip().isin(NUMERIC_SENTINELS)]
+        recovered = pd.to_numeric(raw.str.replace(NON_NUMERIC_PATTERN, '', regex=True), errors='coerce')
+        numeric.loc[recovered.index] = recovered
+        failed = raw[recovered.isna()]
+        if not failed.empty:
+            errors = {'count': len(failed), 'samples': failed.drop_duplicates().head(max_samples).tolist()}
+    return numeric.fillna(0.0), errors
+
+
+def clean_numeric_columns(data, columns=NUMERIC_COLUMNS):
+    """
+    Clean the numeric columns of a DataFrame in place.
+
+    Parameters:
+    - data: The DataFrame to clean.
+    - columns: The column names to convert; missing columns are skipped.
+
+    Returns:
+    - A dict mapping column name to its error summary, for the columns that
+      had values which could not be converted.
+    """
+    errors = {}
+    for column in columns:
+        if column in data.columns:
+            data[column], column_errors = clean_numeric_column(data[column])
+            if column_errors:
+                errors[column] = column_errors
+    return errors
+
+
+def merge_cleaning_errors(errors, new_errors, max_samples=5):
+    """
+    Fold the error summaries of one chunk into a running summary, in place.
+    """
+    for column, summary in new_errors.items():
+        running = errors.setdefault(column, {'count': 0, 'samples': []})
+        running['count'] += summary['count']
+        for value in summary['samples']:
+            if len(running['samples']) < max_samples and value not in running['samples']:
+                running['samples'].append(value)
+    return errors
+
+
+def report_cleaning_errors(errors):
+    """
+    Show one compact warning per column that had unconvertible values.
+    """
+    for column, summary in errors.items():
+        samples = ', '.join(repr(value) for value in summary['samples'])
+        st.warning(f"{summary['count']} value(s) in '{column}' could not be converted and were set to 0 (e.g. {samples}).")
+
+
+def compact_data(data):
+    """
+    Shrink a cleaned DataFrame in place without losing information.
+
+    SKU and Name become categoricals when their values repeat, integer
+    columns are downcast to the smallest integer type that holds them,
+    float columns holding only whole numbers become integers, and other
+    float columns become float32 when every value survives the round trip
+    exactly, except SUMMED_FLOAT_COLUMNS, whose sums need float64 precision.
+
+    Parameters:
+    - data: The DataFrame to compact.
+
+    Returns:
+    - The same DataFrame.
+    """
+    for column in data.columns:
+        values = data[column]
+        if column in CATEGORICAL_COLUMNS:
+            # Codes only pay off when values repeat; unique labels would cost
+            # the codes on top of the strings
+            if not isinstance(values.dtype, pd.CategoricalDtype) and values.nunique() <= len(values) // 2:
+                data[column] = values.astype('category')
+        elif pd.api.types.is_bool_dtype(values):
+            continue
+        elif pd.api.types.is_integer_dtype(values):
+            data[column] = pd.to_numeric(values, downcast='integer')
+        elif pd.api.types.is_float_dtype(values) and values.dtype.itemsize > 4:
+            array = values.to_numpy()
+            if (np.abs(array) < 2 ** 53).all() and (array == np.round(array)).all():
+                data[column] = pd.to_numeric(values.astype('int64'), downcast='integer')
+            elif column not in SUMMED_FLOAT_COLUMNS and np.array_equal(array.astype('float32').astype(array.dtype), array, equal_nan=True):
+                data[column] = values.astype('float32')
+    return data
+
+
+def memory_report(data):
+    """
+    Report the memory used by each column, next to what the same column
+    takes in pandas' default dtypes (text instead of categoricals, 64-bit
+    numbers) as it would be right after parsing.
+
+    Returns:
+    - A DataFrame indexed by column with 'dtype', 'default_bytes',
+      'compact_bytes' and 'saved' (a fraction), plus a '(total)' row.
+    """
+    rows = {}
+    for column in data.columns:
+        values = data[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            default_bytes = values.astype(values.cat.categories.dtype).memory_usage(index=False, deep=True)
+        elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            default_bytes = len(values) * 8
+        else:
+            default_bytes = values.memory_usage(index=False, deep=True)
+        rows[column] = {
+            'dtype': str(values.dtype),
+            'default_bytes': default_bytes,
+            'compact_bytes': values.memory_usage(index=False, deep=True),
+        }
+    report = pd.DataFrame.from_dict(rows, orient='index')
+    report.loc['(total)'] = ['', report['default_bytes'].sum(), report['compact_bytes'].sum()]
+    report['saved'] = 1 - report['compact_bytes'] / report['default_bytes'].where(report['default_bytes'] > 0)
+    return report
+
+
+def _store_path(dataset_id):
+    return os.path.join(DATASET_STORE_DIR, f'{dataset_id}.arrow')
+
+
+def store_dataset(dataset_id, data, source_name='', errors=None):
+    """
+    Write a cleaned dataset to the on-disk store as an uncompressed Arrow
+    file, so it can later be memory-mapped instead of parsed again.
+
+    The file is written under a temporary name and moved into place, so
+    concurrent sessions never see a partial dataset. After writing, the
+    oldest datasets are evicted until the store fits DATASET_STORE_MAX_BYTES.
+
+    Parameters:
+    - dataset_id: The content hash of the source file.
+    - data: The cleaned DataFrame.
+    - source_name: The original file name, shown when listing datasets.
+    - errors: The cleaning error summaries to keep alongside the data.
+    """
+    os.makedirs(DATASET_STORE_DIR, exist_ok=True)
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b'source_name': source_name.encode('utf-8'),
+        b'cleaning_errors': json.dumps(errors or {}, default=str).encode('utf-8'),
+    })
+    path = _store_path(dataset_id)
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+    feather.write_feather(table, temporary_path, compression='uncompressed')
+    os.replace(temporary_path, path)
+    evict_dataset_store()
+
+
+def _read_stored_dataset(dataset_id):
+    """
+    Memory-map a stored dataset.
+
+    Returns:
+    - A tuple (DataFrame, cleaning error summaries), or None if the dataset
+      is not in the store.
+    """
+    path = _store_path(dataset_id)
+    try:
+        table = feather.read_table(path, memory_map=True)
+        # Mark the dataset as recently used so eviction keeps it; another
+        # session may evict it in between, like before the read
+        os.utime(path)
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+    metadata = table.schema.metadata or {}
+    errors = json.loads(metadata.get(b'cleaning_errors', b'{}'))
+    return table.to_pandas(split_blocks=True), errors
+
+
+def shared_datasets_enabled():
+    return os.environ.get(SHARED_DATASETS_ENV, '0') == '1'
+
+
+def list_stored_datasets(dataset_ids=None):
+    """
+    List the datasets in the on-disk store, most recently used first.
+
+    Parameters:
+    - dataset_ids: Only list these datasets, e.g. the uploads of the
+      current session; None lists every dataset.
+
+    Returns:
+    - A list of dicts with 'id', 'name', 'size' in bytes and 'last_used'
+      as a POSIX timestamp.
+    """
+    datasets = []
+    if not os.path.isdir(DATASET_STORE_DIR):
+        return datasets
+    for entry in os.scandir(DATASET_STORE_DIR):
+        if not entry.name.endswith('.arrow'):
+            continue
+        dataset_id = entry.name[:-len('.arrow')]
+        if dataset_ids is not None and dataset_id not in dataset_ids:
+            continue
+        try:
+            metadata = feather.read_table(entry.path, memory_map=True).schema.metadata or {}
+            stat = entry.stat()
+        except (OSError, pa.ArrowInvalid):
+            continue
+        datasets.append({
+            'id': dataset_id,
+            'name': metadata.get(b'source_name', b'').decode('utf-8') or dataset_id[:12],
+            'size': stat.st_size,
+            'last_used': stat.st_mtime,
+        })
+    return sorted(datasets, key=lambda dataset: dataset['last_used'], reverse=True)
+
+
+def evict_dataset_store(max_bytes=DATASET_STORE_MAX_BYTES):
+    """
+    Delete the least recently used datasets until the store fits in
+    `max_bytes`.
+    """
+    datasets = list_stored_datasets()
+    total = sum(dataset['size'] for dataset in datasets)
+    while datasets and total > max_bytes:
+        oldest = datasets.pop()
+        try:
+            os.remove(_store_path(oldest['id']))
+        except FileNotFoundError:
+            pass
+        total -= oldest['size']
+
+
+def parse_file_bytes(file_bytes, file_extension, rename_items, excel_workers=None):
+    """
+    Parse raw file bytes into a DataFrame, apply the column renames, parse
+    the transaction date column, clean the numeric columns and compact the
+    result.
+
+    Parameters:
+    - file_bytes: The file contents.
+    - file_extension: 'csv', 'xls' or 'xlsx'.
+    - rename_items: The column renames as (old, new) pairs.
+    - excel_workers: Upper bound on the processes reading Excel sheets.
+
+    Returns:
+    - A tuple (DataFrame, cleaning error summaries by column).
+    """
+    if file_extension == 'csv':
+        data = pd.read_csv(io.BytesIO(file_bytes))
+    else:
+        # Every sheet is read, tagged with its name
+        data = read_excel_sheets(file_bytes, file_extension, max_workers=excel_workers)
+    data.rename(columns=dict(rename_items), inplace=True)
+    parse_date_column(data)
+    errors = clean_numeric_columns(data)
+    compact_data(data)
+    return data, errors
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _parse_file(file_hash, file_extension, rename_items, source_name, _file_bytes):
+    """
+    Parse an uploaded file through parse_file_bytes.
+
+    The cache is keyed by the content hash, the extension and the rename map;
+    the bytes themselves are not hashed again. One frame is shared by every
+    session that uploads the same file; callers get it through process_data,
+    which hands out copy-on-write views so in-place changes stay private.
+
+    Files that were already parsed, by this or any earlier process, are
+    memory-mapped from the dataset store instead of parsed again.
+
+    Returns:
+    - A tuple (DataFrame, cleaning error summaries by column).
+    """
+    stored = _read_stored_dataset(file_hash)
+    if stored is not None:
+        data, errors = stored
+        return compact_data(data), errors
+
+    data, errors = parse_file_bytes(_file_bytes, file_extension, rename_items)
+    if 'SKU' in data.columns:
+        try:
+            store_dataset(file_hash, data, source_name, errors)
+        except (OSError, pa.ArrowException):
+            # The store is only an accelerator; keep serving the parsed data
+            pass
+    return data, errors
+
+
+def _ingest_file(file_hash, file_extension, rename_items, source_name, file_bytes):
+    """
+    Parse a file in a worker process and write it to the dataset store,
+    where _parse_file picks it up without parsing it again. Only whether
+    the file was stored travels back, not the frame itself.
+
+    Returns:
+    - True if the dataset is in the store.
+    """
+    if os.path.exists(_store_path(file_hash)):
+        return True
+    data, errors = parse_file_bytes(file_bytes, file_extension, rename_items, excel_workers=1)
+    if 'SKU' not in data.columns:
+        return False
+    store_dataset(file_hash, data, source_name, errors)
+    return True
+
 
 def process_data(uploaded_file, file_extension):
     """
-    Process the uploaded CSV file.
+    Process the uploaded CSV or Excel file.
+
+    Parsing, numeric cleaning and compaction are memoized on a hash of the
+    file contents, so reruns with the same upload return the already-cleaned
+    frame without reading it again. Every sheet of an Excel workbook is
+    read, and the rows carry the sheet name in a 'Sheet' column.
 
     Parameters:
     - uploaded_file: The uploaded file object from Streamlit's file_uploader.
+    - file_extension: The lower-case extension of the uploaded file.
 
     Returns:
     - A pandas DataFrame if successful, None otherwise.
     """
     if uploaded_file is not None:
+        if file_extension not in ['csv', 'xls', 'xlsx']:
+            return None  # Handle other file formats or raise an error
         try:
-            if file_extension == 'csv':
-                data = pd.read_csv(uploaded_file)
-            elif file_extension in ['xls', 'xlsx']:
-                data = pd.read_excel(uploaded_file)
-            else:
-                return None  # Handle other file formats or raise an error
-            
-            #rename fields from french to english
-            data.rename(columns={'Produit':'SKU','Quantité': 'Quantity', 'Coût': 'Price', 'Marge': 'Margin'}, inplace=True)
+            file_bytes = uploaded_file.getvalue()
+            file_hash = content_hash(file_bytes)
+            data, errors = _parse_file(
+                file_hash,
+                file_extension,
+                tuple(FRENCH_COLUMN_RENAMES.items()),
+                getattr(uploaded_file, 'name', ''),
+                file_bytes
+            )
             # Perform some basic validation
             if 'SKU' not in data.columns:
                 st.error("The uploaded file must have an 'SKU' column.")
                 return None
+            report_cleaning_errors(errors)
             # Add additional necessary validations as needed
-            return data
+            # A shallow copy is copy-on-write, so the shared cached frame is never modified
+            return set_fingerprint(data.copy(deep=False), file_hash)
         except pd.errors.EmptyDataError:
             st.error("The uploaded file is empty.")
         except pd.errors.ParserError:
@@ -37,6 +447,338 @@ def process_data(uploaded_file, file_extension):
     return None
 
 
+def _file_extension(uploaded_file):
+    return uploaded_file.name.split('.')[-1].lower()
+
+
+def _ingest_in_parallel(uploaded_files, progress, max_workers=None):
+    """
+    Parse the files that are not in the dataset store yet in a process
+    pool, advancing `progress` as each file finishes. Files that fail here
+    are left to process_data, which parses them again and reports the error.
+    """
+    rename_items = tuple(FRENCH_COLUMN_RENAMES.items())
+    pending = []
+    for uploaded_file in uploaded_files:
+        file_bytes = uploaded_file.getvalue()
+        file_hash = content_hash(file_bytes)
+        extension = _file_extension(uploaded_file)
+        if extension in ['csv', 'xls', 'xlsx'] and not os.path.exists(_store_path(file_hash)):
+            pending.append((file_hash, extension, rename_items, uploaded_file.name, file_bytes))
+
+    total = len(uploaded_files)
+    done = total - len(pending)
+    workers = min(len(pending), max_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        return
+    with process_pool(workers) as executor:
+        futures = {executor.submit(_ingest_file, *arguments): arguments[3] for arguments in pending}
+        for future in as_completed(futures):
+            done += 1
+            progress.progress(done / total, text=f"{futures[future]} ({done}/{total})")
+            try:
+                future.result()
+            except Exception:
+                pass
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _merge_files(file_keys, _frames):
+    """
+    Concatenate the frames of several uploads, tagging each row with the
+    name of its file in a SOURCE_COLUMN column.
+
+    The cache is keyed by the (content hash, file name) pairs, so reruns
+    reuse the merged frame.
+    """
+    merged = pd.concat(_frames, ignore_index=True)
+    names = [name for _, name in file_keys]
+    codes = np.repeat(np.arange(len(_frames)), [len(frame) for frame in _frames])
+    merged[SOURCE_COLUMN] = pd.Categorical.from_codes(codes, categories=pd.Index(names).unique())
+    return compact_data(merged)
+
+
+def process_files(uploaded_files, max_workers=None):
+    """
+    Process several uploaded files and merge them into one dataset.
+
+    Files that were not parsed before are parsed in parallel in a process
+    pool, with a progress bar advancing per file. Each file then goes
+    through process_data, so the extension check, the column renames, the
+    SKU validation and the error reports are the same as for a single
+    upload. Files that fail are reported and left out of the merge.
+
+    Parameters:
+    - uploaded_files: The uploaded file objects from Streamlit's file_uploader.
+    - max_workers: Upper bound on worker processes; defaults to the CPU count.
+
+    Returns:
+    - A pandas DataFrame with a SOURCE_COLUMN column naming the file of
+      each row, the frame of process_data for a single file, or None if
+      no file could be processed.
+    """
+    if not uploaded_files:
+        return None
+    if len(uploaded_files) == 1:
+        return process_data(uploaded_files[0], _file_extension(uploaded_files[0]))
+
+    progress = st.progress(0.0)
+    _ingest_in_parallel(uploaded_files, progress, max_workers)
+
+    frames = []
+    file_keys = []
+    for position, uploaded_file in enumerate(uploaded_files, start=1):
+        data = process_data(uploaded_file, _file_extension(uploaded_file))
+        progress.progress(position / len(uploaded_files), text=f"{uploaded_file.name} ({position}/{len(uploaded_files)})")
+        if data is None:
+            st.error(f"{uploaded_file.name} could not be processed and was left out.")
+            continue
+        frames.append(data)
+        file_keys.append((fingerprint(data), uploaded_file.name))
+    progress.empty()
+
+    if not frames:
+        return None
+    merged = _merge_files(tuple(file_keys), frames)
+    return set_fingerprint(merged.copy(deep=False), derive_fingerprint(*[part for key in file_keys for part in key]))
+
+
+def _missing(values, rows):
+    # `rows` missing values of the column's type, upcast where it has no NA
+    return values.iloc[:0].reindex(range(rows))
+
+
+def _append_column(values, new_values):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Existing codes are kept; only the new rows are encoded, with any
+        # new labels added after the existing categories
+        if not isinstance(new_values.dtype, pd.CategoricalDtype):
+            new_values = new_values.astype('category')
+        if values.cat.categories.dtype != new_values.cat.categories.dtype:
+            # e.g. numeric SKUs in one file and text SKUs in the other; the
+            # union needs one type of label, and text holds both
+            values = values.cat.rename_categories(values.cat.categories.astype(str))
+            new_values = new_values.cat.rename_categories(new_values.cat.categories.astype(str))
+        combined = union_categoricals([values.array, new_values.array], ignore_order=True)
+        return pd.Series(combined, name=values.name)
+    if isinstance(new_values.dtype, pd.CategoricalDtype):
+        new_values = new_values.astype(new_values.cat.categories.dtype)
+    if pd.api.types.is_string_dtype(values) != pd.api.types.is_string_dtype(new_values):
+        values, new_values = values.astype(str), new_values.astype(str)
+    return pd.concat([values, new_values], ignore_index=True)
+
+
+def _label_dtype(values):
+    return values.cat.categories.dtype if isinstance(values.dtype, pd.CategoricalDtype) else values.dtype
+
+
+def append_data(data, new_data, source_name=None):
+    """
+    Append the rows of a newly ingested file to a dataset.
+
+    Only the new rows are converted: categorical columns keep their codes
+    and the new rows are encoded against them, so the result stays compact
+    without a pass over the existing rows. The result records `data` in its
+    append history, so sku_rollup, time_rollups and the rankings of the
+    result are updated from the new rows only. When the two disagree on the
+    type of a text column, e.g. numeric SKUs in one and text in the other,
+    both are converted to text, and with relabeled SKUs the aggregates of
+    the result are computed again.
+
+    Parameters:
+    - data: The current dataset.
+    - new_data: The cleaned rows to append, e.g. from process_data.
+    - source_name: The file name, set in SOURCE_COLUMN when the dataset
+      has one.
+
+    Returns:
+    - The combined DataFrame, with a fingerprint derived from both.
+    """
+    if SOURCE_COLUMN in data.columns and source_name is not None:
+        new_data = new_data.assign(**{SOURCE_COLUMN: source_name})
+    columns = list(data.columns) + [column for column in new_data.columns if column not in data.columns]
+    merged = {}
+    for column in columns:
+        if column not in new_data.columns:
+            merged[column] = pd.concat([data[column], _missing(data[column], len(new_data))], ignore_index=True)
+        elif column not in data.columns:
+            merged[column] = pd.concat([_missing(new_data[column], len(data)), new_data[column]], ignore_index=True)
+        else:
+            merged[column] = _append_column(data[column], new_data[column])
+    merged = pd.DataFrame(merged)
+    set_fingerprint(merged, derive_fingerprint(fingerprint(data), 'append', fingerprint(new_data)))
+    if 'SKU' in data.columns and _label_dtype(merged['SKU']) != _label_dtype(data['SKU']):
+        # The SKUs were relabeled, e.g. as text, so the aggregates of the
+        # earlier versions no longer match them and are computed again
+        return merged
+    return set_append_history(merged, append_history(data) + ((fingerprint(data), len(data)),))
+
+
+def append_files(data, uploaded_files, known_files):
+    """
+    Append the uploaded files that are not part of a dataset yet to it.
+
+    Each new file is ingested alone through process_data, so parsing and
+    cleaning only cost the size of the file, and then appended with
+    append_data.
+
+    Parameters:
+    - data: The current dataset.
+    - uploaded_files: The uploaded file objects from Streamlit's file_uploader.
+    - known_files: The content hashes of the files already in `data`.
+
+    Returns:
+    - A tuple (dataset, content hashes of the files in it).
+    """
+    known_files = set(known_files)
+    for uploaded_file in uploaded_files:
+        file_hash = content_hash(uploaded_file.getvalue())
+        if file_hash in known_files:
+            continue
+        new_data = process_data(uploaded_file, _file_extension(uploaded_file))
+        if new_data is None:
+            st.error(f"{uploaded_file.name} could not be processed and was not appended.")
+            continue
+        try:
+            data = append_data(data, new_data, uploaded_file.name)
+        except Exception as e:
+            st.error(f"{uploaded_file.name} could not be appended: {e}")
+            continue
+        known_files.add(file_hash)
+    return data, frozenset(known_files)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _aggregate_csv_chunks(file_hash, rename_items, chunksize, _source):
+    """
+    Stream a CSV source in chunks, cleaning each chunk and folding it into
+    per-SKU running totals. Only the columns the aggregates need are read,
+    and no more than one chunk of rows is held in memory at a time.
+
+    Returns:
+    - A tuple (per-SKU aggregates, cleaning error summaries), or
+      (None, {}) if the file has no 'SKU' column.
+    """
+    renames = dict(rename_items)
+    chunks = pd.read_csv(
+        _source,
+        chunksize=chunksize,
+        usecols=lambda name: renames.get(name, name) in STREAMING_COLUMNS
+    )
+    aggregates = empty_sku_aggregates()
+    errors = {}
+    for chunk in chunks:
+        chunk.rename(columns=renames, inplace=True)
+        if 'SKU' not in chunk.columns:
+            return None, {}
+        merge_cleaning_errors(errors, clean_numeric_columns(chunk))
+        aggregates = merge_sku_aggregates(aggregates, aggregate_sku_chunk(chunk))
+    return aggregates, errors
+
+
+def process_files_chunked(uploaded_files, chunksize=STREAMING_CHUNK_SIZE):
+    """
+    Process several uploaded files in streaming mode and merge their per-SKU
+    aggregates. Files that fail are reported and left out.
+
+    Returns:
+    - A DataFrame of per-SKU aggregates if any file could be processed,
+      None otherwise.
+    """
+    aggregates = empty_sku_aggregates()
+    file_keys = []
+    for uploaded_file in uploaded_files:
+        file_aggregates = process_data_chunked(uploaded_file, _file_extension(uploaded_file), chunksize)
+        if file_aggregates is None:
+            st.error(f"{uploaded_file.name} could not be processed and was left out.")
+            continue
+        aggregates = merge_sku_aggregates(aggregates, file_aggregates)
+        file_keys.append(fingerprint(file_aggregates))
+    if not file_keys:
+        return None
+    if len(file_keys) == 1:
+        return aggregates
+    return set_fingerprint(finalize_sku_aggregates(aggregates), derive_fingerprint(*file_keys))
+
+
+def process_data_chunked(uploaded_file, file_extension, chunksize=STREAMING_CHUNK_SIZE):
+    """
+    Process the uploaded file in streaming mode, keeping only per-SKU
+    aggregates instead of the full row-level frame.
+
+    CSV files are read in chunks of `chunksize` rows so peak memory stays
+    roughly constant as the file grows. Excel files are streamed sheet by
+    sheet through process_data first.
+
+    Parameters:
+    - uploaded_file: The uploaded file object from Streamlit's file_uploader.
+    - file_extension: The lower-case extension of the uploaded file.
+    - chunksize: The number of rows to read per chunk.
+
+    Returns:
+    - A DataFrame of per-SKU aggregates (see aggregations.SKU_AGGREGATE_COLUMNS)
+      if successful, None otherwise.
+    """
+    if uploaded_file is None:
+        return None
+    if file_extension in ['xls', 'xlsx']:
+        data = process_data(uploaded_file, file_extension)
+        if data is None:
+            return None
+        return finalize_sku_aggregates(aggregate_sku_chunk(data))
+    if file_extension != 'csv':
+        return None
+    try:
+        with uploaded_file.getbuffer() as buffer:
+            file_hash = content_hash(buffer)
+        uploaded_file.seek(0)
+        aggregates, errors = _aggregate_csv_chunks(
+            file_hash,
+            tuple(FRENCH_COLUMN_RENAMES.items()),
+            chunksize,
+            uploaded_file
+        )
+        if aggregates is None:
+            st.error("The uploaded file must have an 'SKU' column.")
+            return None
+        report_cleaning_errors(errors)
+        return set_fingerprint(finalize_sku_aggregates(aggregates), derive_fingerprint(file_hash, 'sku_aggregates'))
+    except pd.errors.EmptyDataError:
+        st.error("The uploaded file is empty.")
+    except pd.errors.ParserError:
+        st.error("The uploaded file could not be parsed.")
+    except Exception as e:
+        st.error(f"An error occurred: {e}")
+    return None
+
+
+def load_file(file_path, excel_workers=None):
+    """
+    Read a CSV or Excel file from disk with the same rules as process_data,
+    for use outside a Streamlit session. Problems are raised instead of
+    shown with st.error.
+
+    Parameters:
+    - file_path: The path to the file.
+    - excel_workers: Upper bound on the processes reading Excel sheets.
+
+    Returns:
+    - A tuple (DataFrame, cleaning error summaries by column).
+
+    Raises:
+    - ValueError: If the file type is not supported or there is no 'SKU' column.
+    """
+    file_extension = os.path.splitext(file_path)[1].lstrip('.').lower()
+    if file_extension not in ['csv', 'xls', 'xlsx']:
+        raise ValueError(f"Unsupported file type: {file_path}")
+    with open(file_path, 'rb') as handle:
+        file_bytes = handle.read()
+    data, errors = parse_file_bytes(file_bytes, file_extension, tuple(FRENCH_COLUMN_RENAMES.items()), excel_workers)
+    if 'SKU' not in data.columns:
+        raise ValueError("The file must have an 'SKU' column.")
+    return set_fingerprint(data, content_hash(file_bytes)), errors
+
+
 def load_data(file_path):
     """
     Load data from a CSV file at the given file path.
@@ -62,3 +804,24 @@ def load_data(file_path):
     except Exception as e:
         st.error(f"An error occurred: {e}")
     return None
+
+
+def load_stored_data(dataset_id):
+    """
+    Open a dataset from the on-disk store by its id, memory-mapping the
+    stored Arrow file instead of parsing any text.
+
+    Parameters:
+    - dataset_id: The id of a stored dataset, as returned by
+      list_stored_datasets.
+
+    Returns:
+    - A pandas DataFrame if the dataset is stored, None otherwise.
+    """
+    stored = _read_stored_dataset(dataset_id)
+    if stored is None:
+        st.error("The selected dataset is no longer available.")
+        return None
+    data, errors = stored
+    report_cleaning_errors(errors)
+    return set_fingerprint(compact_data(data), dataset_id)
@@ -1,6 +1,8 @@
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
+from aggregations import sku_rollup, top_skus
+from components.graphs import chart_key, histogram_with_kde, render_chart
+from utils.fingerprint import fingerprint
+from utils.profiling import timed_section
 
 def show(data, translations):
     """
@@ -27,34 +29,78 @@ def show(data, translations):
         st.error(translations["data_error"])
 
 
+@timed_section('analysis.display_margin_analysis')
 def display_margin_analysis(data, translations):
     """
     Display margin analysis as a histogram.
     """
     st.markdown("### " + translations["margin_analysis"])
+    render_chart(
+        chart_key('margin_analysis', fingerprint(data), 'Margin'),
+        lambda: draw_margin_analysis_chart(data['Margin'])
+    )
+
+
+def draw_margin_analysis_chart(margins):
+    """
+    Draws the margin histogram with its density curve, and returns the
+    figure.
+    """
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots()
-    sns.histplot(data['Margin'], bins=20, kde=True, ax=ax)
-    st.pyplot(fig)
+    histogram_with_kde(ax, margins, bins=20)
+    return fig
 
 
+@timed_section('analysis.display_price_quantity_correlation')
 def display_price_quantity_correlation(data, translations):
     """
     Display a scatter plot showing the correlation between price and quantity.
     """
     st.markdown("### " + translations["correlation_analysis"])
+    render_chart(
+        chart_key('correlation_analysis', fingerprint(data), 'Price', 'Quantity'),
+        lambda: draw_price_quantity_chart(data)
+    )
+
+
+def draw_price_quantity_chart(data):
+    """
+    Draws Quantity against Price, one point per row, and returns the figure.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     fig, ax = plt.subplots()
     sns.scatterplot(x='Price', y='Quantity', data=data, ax=ax)
-    st.pyplot(fig)
+    return fig
 
 
+@timed_section('analysis.display_top_selling_products')
 def display_top_selling_products(data, translations):
     """
     Display a bar chart of the top-selling products.
     """
     st.markdown("### " + translations["top_selling_products"])
-    top_selling = data.groupby('SKU')['Quantity'].sum().sort_values(ascending=False).head(10)
+    rollup = sku_rollup(data)
+    top_selling = top_skus(rollup, 'Quantity', 10)['Quantity']
+    render_chart(
+        chart_key('top_selling_products', fingerprint(rollup), 'Quantity', 10, translations["quantity"], translations["sku"]),
+        lambda: draw_top_selling_chart(top_selling, translations["quantity"], translations["sku"])
+    )
+
+
+def draw_top_selling_chart(top_selling, quantity_label, sku_label):
+    """
+    Draws the quantity bars of the top-selling SKUs, best first, and returns
+    the figure.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     fig, ax = plt.subplots()
     sns.barplot(x=top_selling.values, y=top_selling.index, palette="viridis", ax=ax)
-    ax.set_xlabel(translations["quantity"])
-    ax.set_ylabel(translations["sku"])
-    st.pyplot(fig)
+    ax.set_xlabel(quantity_label)
+    ax.set_ylabel(sku_label)
+    return fig
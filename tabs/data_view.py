@@ -1,4 +1,11 @@
+import pandas as pd
 import streamlit as st
+from aggregations import sorted_labels
+from components.exports import download_controls
+from utils.fingerprint import fingerprint
+
+# Page sizes offered in the data table
+PAGE_SIZES = [25, 50, 100, 500]
 
 def show(data, translations):
     """
@@ -10,39 +17,97 @@ def show(data, translations):
     """
     st.markdown("## " + translations["data_view_tab"])
 
-    # You can add options for the user to choose columns to display, sort the data, or apply additional filters.
     st.markdown("### " + translations["data_table"])
-    # Display a snapshot of the data or use a custom table component.
-    st.dataframe(data)
+    show_data_table(data, translations)
     
-    # Additional features like downloading the data as a CSV file can also be included.
-    st.markdown("### " + translations["download_csv"])
-    st.download_button(
-        label=translations["download_csv"],
-        data=data.to_csv().encode('utf-8'),
-        file_name='detailed_data.csv',
-        mime='text/csv',
-        key='download-csv'
+    # Downloads are built lazily, only when the button is clicked
+    st.markdown("### " + translations["download_data"])
+    download_controls(data, translations, 'detailed_data', 'download-csv')
+
+
+@st.fragment
+def show_data_table(data, translations):
+    """
+    Shows the sorting and paging controls with the current page. Runs as a
+    fragment, so sorting or turning pages only reruns the table.
+    """
+    # Sorting and paging controls; only the visible page is sent to the browser
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        sort_column = st.selectbox(
+            translations["sort_by"],
+            [None] + list(data.columns),
+            format_func=lambda column: translations["no_sorting"] if column is None else str(column),
+            key="data_view_sort_column"
+        )
+    with col2:
+        ascending = st.radio(
+            translations["sort_order"],
+            [True, False],
+            format_func=lambda value: translations["ascending"] if value else translations["descending"],
+            horizontal=True,
+            key="data_view_sort_order"
+        )
+    with col3:
+        rows_per_page = st.selectbox(translations["rows_per_page"], PAGE_SIZES, index=1, key="data_view_page_size")
+
+    paginator = Paginator(data, rows_per_page=rows_per_page, sort_column=sort_column, ascending=ascending)
+    page = st.number_input(
+        label=translations["page_number"],
+        min_value=1,
+        max_value=paginator.max_page,
+        value=1,
+        key="data_view_page"
     )
-    
-    # If your dataset is large, consider adding a paginator to view data in chunks.
-    # paginator = Paginator(data)
-    # page = st.number_input(label="Page Number", min_value=1, max_value=paginator.max_page, value=1)
-    # st.dataframe(paginator.get_page(page))
-    
-    # If data is very large, you can provide options to display only a subset of data.
-    # For example, you could add a slider to let the user decide how many rows to view.
-    # row_count = st.slider("Number of rows to display", 1, len(data), 50)
-    # st.dataframe(data.head(row_count))
-
-# A paginator class (optional) to handle large datasets
-# class Paginator:
-#     def __init__(self, dataframe, rows_per_page=50):
-#         self.dataframe = dataframe
-#         self.rows_per_page = rows_per_page
-#         self.max_page = (len(dataframe) - 1) // rows_per_page + 1
-
-#     def get_page(self, page_number):
-#         start_row = (page_number - 1) * self.rows_per_page
-#         end_row = start_row + self.rows_per_page
-#         return self.dataframe.iloc[start_row:end_row]
+    first_row, last_row = paginator.page_bounds(page)
+    st.caption(translations["rows_summary"].format(
+        first=first_row + 1 if last_row else 0,
+        last=last_row,
+        total=len(data),
+        columns=len(data.columns),
+        pages=paginator.max_page
+    ))
+    st.dataframe(paginator.get_page(page))
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _sort_permutation(data_fingerprint, sort_column, ascending, _data):
+    """
+    Returns the row positions of `_data` in sorted order. Cached so paging
+    through a sorted table only sorts it once.
+    """
+    column = _data[sort_column].reset_index(drop=True)
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Sort by the labels rather than by the order of the categories
+        column = column.cat.reorder_categories(sorted_labels(column.cat.categories))
+    return column.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+
+
+class Paginator:
+    """
+    Splits a DataFrame into pages, optionally in the order of a sorted column.
+    """
+    def __init__(self, dataframe, rows_per_page=50, sort_column=None, ascending=True):
+        self.dataframe = dataframe
+        self.rows_per_page = rows_per_page
+        self.max_page = max((len(dataframe) - 1) // rows_per_page + 1, 1)
+        self.order = None
+        if sort_column is not None:
+            self.order = _sort_permutation(fingerprint(dataframe), sort_column, ascending, dataframe)
+
+    def page_bounds(self, page_number):
+        """
+        Returns the (start, end) row positions of a 1-based page number.
+        """
+        start_row = (min(max(page_number, 1), self.max_page) - 1) * self.rows_per_page
+        end_row = min(start_row + self.rows_per_page, len(self.dataframe))
+        return start_row, end_row
+
+    def get_page(self, page_number):
+        """
+        Returns the rows of a 1-based page number.
+        """
+        start_row, end_row = self.page_bounds(page_number)
+        if self.order is None:
+            return self.dataframe.iloc[start_row:end_row]
+        return self.dataframe.iloc[self.order[start_row:end_row]]
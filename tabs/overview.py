@@ -1,19 +1,16 @@
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
 import pandas as pd
-from components.cards import create_card, create_statistic_card
-import locale
+from components.cards import metric_card_html, render_card_row, statistic_card_html
+from components.graphs import chart_key, histogram_with_kde, render_chart
+from utils.fingerprint import fingerprint
+from utils.profiling import timed_section
+from utils.number_format import format_number, format_numbers
+from aggregations import (
+    TIME_GRAINS, downsample_periods, kpis_from_sku_aggregates, reduce_sku_rollup, sku_rollup, sorted_labels, time_rollups, top_skus
+)
 
 
-try:
-    locale.setlocale(locale.LC_ALL, 'fr_FR.UTF-8')
-except locale.Error:
-    locale.setlocale(locale.LC_ALL, 'C')  # Fallback to the standard C locale
-
-
-
-def format_all_currencies(value):
+def format_all_currencies(value, translations):
     """
     Formats and converts the value into Dirhams, Ryals, and Centimes,
     and presents them in a more readable format.
@@ -21,7 +18,7 @@ def format_all_currencies(value):
     value_in_ryal = value * 20  # 1 Dirham = 20 Ryals
     value_in_centime = value * 100  # 1 Dirham = 100 Centimes
 
-    formatted_dirham = locale.format_string("%.2f Dhs", value, grouping=True)
+    formatted_dirham = format_number(value, translations, 'currency')
     
     return f"{formatted_dirham}<br>"
 
@@ -44,23 +41,46 @@ def show(data, translations):
     # Middle Section - Detailed Analysis
     generate_detailed_analysis(data, translations)
 
-    # Bottom Section - Sales Over Time Chart
+    # Bottom Section - Sales Over Time Chart, when the data has dates
+    generate_sales_trend_chart(data, translations)
     generate_sales_over_time_chart(data, translations)
 
-def plot_profitability_chart(data, selected_skus):
+def show_aggregates(aggregates, translations):
+    """
+    Displays the overview KPIs and top products from per-SKU aggregates,
+    for datasets ingested in streaming mode without a row-level frame.
+    """
+    create_kpi_cards(kpis_from_sku_aggregates(aggregates), translations)
+    create_top_products_cards(aggregates, translations)
+
+def plot_profitability_chart(rollup, selected_skus):
     """
     Plots a bar chart showing the profitability of the selected top products.
     """
-    # Filter data to include only the selected products
-    filtered_data = data[data['SKU'].isin(selected_skus)]
+    # Show the plot
+    render_chart(
+        chart_key('profitability', fingerprint(rollup), 'Profit', tuple(selected_skus)),
+        lambda: draw_profitability_chart(rollup, selected_skus)
+    )
+
+def draw_profitability_chart(rollup, selected_skus):
+    """
+    Draws the profit bars of the selected products from a SKU rollup, and
+    returns the figure.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Look up the selected products in the SKU rollup
+    selected_profit = rollup.loc[selected_skus, 'Profit']
 
     # Create a bar chart
     plt.figure(figsize=(10, 6))
     barplot = sns.barplot(
-        x='SKU', 
-        y='Profit', 
-        data=filtered_data,
-        order=selected_skus  # This ensures the bars follow the selected order
+        x=selected_profit.index.astype(str), 
+        y=selected_profit.values,
+        order=[str(sku) for sku in selected_skus],  # This ensures the bars follow the selected order
+        errorbar=None
     )
 
     # Add labels and title
@@ -70,128 +90,82 @@ def plot_profitability_chart(data, selected_skus):
     
     # Rotate x-axis labels
     plt.xticks(rotation=45)  # Rotate labels to make them readable
+    return barplot.figure
 
-    # Show the plot
-    st.pyplot(barplot.figure)
-
+@timed_section('overview.show_profitability_analysis')
 def show_profitability_analysis(data, translations):
     """
     Shows an interactive profitability analysis section.
     """
     st.markdown("## " + translations["profitability_analysis"])
+    show_profitability_selection(sku_rollup(data), translations)
 
-    # Get all unique SKUs and the top 10 profitable SKUs
-    all_skus = data['SKU'].unique().tolist()
-    top_skus = data.groupby('SKU')['Profit'].sum().sort_values(ascending=False).head(10).index.tolist()
+@st.fragment
+def show_profitability_selection(rollup, translations):
+    """
+    Shows the product selection and the profitability chart. Runs as a
+    fragment, so changing the selection only reruns this section, reading
+    the shared SKU rollup it was given.
+    """
+    # Get all SKUs and the top 10 profitable SKUs from the shared rollup
+    all_skus = sorted_labels(rollup.index).tolist()
+    top_profit_skus = top_skus(rollup, 'Profit', 10).index.tolist()
 
     # Multiselect dropdown that includes all products but defaults to the top 10
     selected_skus = st.multiselect(
         label=translations["select_products_to_view"], 
         options=all_skus, 
-        default=top_skus  # Set the top 10 SKUs as the default selection
+        default=top_profit_skus,  # Set the top 10 SKUs as the default selection
+        key="profitability_skus"
     )
 
     # If products are selected, plot the chart
     if selected_skus:
-        plot_profitability_chart(data, selected_skus)
+        plot_profitability_chart(rollup, selected_skus)
     else:
         st.warning(translations["no_product_selected_warning"])
 
-# Assuming you have a function to convert the raw metrics into formatted strings
-def format_metric(value, metric_type):
-    try:
-        # Convert value to float
-        numeric_value = float(value)
-        
-        if metric_type == "currency":
-            formatted = f"{numeric_value:.2f}"
-        elif metric_type == "quantity":
-            formatted = f"{numeric_value:.0f}"
-        else:
-            formatted = f"{numeric_value}"
-        
-        # Add thousand separators
-        parts = formatted.split(".")
-        parts[0] = "{:,}".format(int(float(parts[0]))).replace(",", " ")
-        formatted = ".".join(parts)
-        
-        if metric_type == "currency":
-            return formatted + " Dhs"
-        return formatted
-    except ValueError:
-        # If conversion to float fails, return the original value as a string
-        return str(value)
-
-def create_multi_metric_card(rank, sku, metrics, translations):
-    # Define symbols for each rank
-    rank_symbols = {
-        1: "🥇",
-        2: "🥈",
-        3: "🥉"
-    }
-    rank_symbol = rank_symbols.get(rank, "")
-
-    with st.container():
-        # Use a card-like layout with shadows for a subtle 3D effect
-        st.markdown(f"""
-            <style>
-            .metric-container {{
-                border-radius: 10px;
-                background-color: #f8f9fa;
-                box-shadow: 0 4px 8px 0 rgba(0,0,0,0.2);
-                transition: 0.3s;
-                padding: 15px;
-                margin-bottom: 10px;
-            }}
-            .metric-container:hover {{
-                box-shadow: 0 8px 16px 0 rgba(0,0,0,0.2);
-            }}
-            .metric-title {{
-                font-size: 1.25rem;
-                font-weight: 500;
-                margin: 0;
-                padding: 0;
-                color: #333;
-            }}
-            .metric-value {{
-                font-size: 2rem;
-                font-weight: bold;
-                margin: 0;
-                padding: 0;
-                color: #1a73e8;  /* Change color to suit your branding */
-            }}
-            .metric-label {{
-                font-size: 1rem;
-                color: #6c757d;
-            }}
-            </style>
-            <div class="metric-container">
-                <p class="metric-title"><span class="rank-symbol">{rank_symbol}</span>{sku}</p>
-                <div class="row">
-                    <div class="col">
-                        <p class="metric-value">{format_metric(metrics['Quantity'], 'quantity')}</p>
-                        <p class="metric-label">{translations["total_items_sold"]}</p>
-                    </div>
-                    <div class="col">
-                        <p class="metric-value">{format_metric(metrics['Total'], 'currency')}</p>
-                        <p class="metric-label">{translations["total_sales"]}</p>
-                    </div>
-                    <div class="col">
-                        <p class="metric-value">{format_metric(metrics['Profit'], 'currency')}</p>
-                        <p class="metric-label">{translations["total_profit"]}</p>
-                    </div>
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
+def format_top_products(top_products, translations):
+    """
+    Formats the card metrics of the top products in one pass per column.
+
+    Returns:
+    - A DataFrame with the same index and formatted 'Quantity', 'Total' and
+      'Profit' strings.
+    """
+    return pd.DataFrame({
+        'Quantity': format_numbers(top_products['Quantity'], translations, 'quantity'),
+        'Total': format_numbers(top_products['Total'], translations, 'currency'),
+        'Profit': format_numbers(top_products['Profit'], translations, 'currency'),
+    }, index=top_products.index)
+
+def multi_metric_card_html(rank, sku, metrics, translations):
+    """
+    Returns the HTML of one top product card from its formatted metrics.
+    """
+    return metric_card_html(sku, [
+        (metrics['Quantity'], translations["total_items_sold"]),
+        (metrics['Total'], translations["total_sales"]),
+        (metrics['Profit'], translations["total_profit"]),
+    ], rank=rank)
 
  
+@timed_section('overview.generate_top_products_cards')
 def generate_top_products_cards(data, translations):
+    create_top_products_cards(sku_rollup(data), translations)
+
+@st.fragment
+def create_top_products_cards(rollup, translations):
+    """
+    Render the top products cards from a SKU rollup, three per row. Runs as
+    a fragment, so changing the sort or the count only reruns the cards.
+    """
     st.markdown("## " + translations["top_products"])
     
     # Add a dropdown menu for sorting criteria
     sort_criteria = st.selectbox(
         translations["sort_by"],
-        [translations["total_items_sold"], translations["total_profit"], translations["total_sales"]],
+        [translations["total_items_sold"], translations["total_profit"], translations["total_sales"], translations["average_margin"]],
         key="top_products_sort"
     )
     
@@ -199,61 +173,61 @@ def generate_top_products_cards(data, translations):
     sort_column = {
         translations["total_items_sold"]: "Quantity",
         translations["total_profit"]: "Profit",
-        translations["total_sales"]: "Total"
+        translations["total_sales"]: "Total",
+        translations["average_margin"]: "Margin"
     }[sort_criteria]
+
+    # Let the user grow the leaderboard past the podium
+    product_count = st.number_input(
+        translations["products_to_show"],
+        min_value=1,
+        value=3,
+        step=1,
+        key="top_products_count"
+    )
     
-    # Calculate top 3 products based on the selected criteria
-    top_products_data = data.groupby('SKU').agg({
-        'Quantity': lambda x: pd.to_numeric(x, errors='coerce').sum(),
-        'Total': lambda x: pd.to_numeric(x, errors='coerce').sum(),
-        'Profit': lambda x: pd.to_numeric(x, errors='coerce').sum(),
-    }).sort_values(by=sort_column, ascending=False).head(3)
-
-    col1, col2, col3 = st.columns(3)
-    columns = [col1, col2, col3]
-    
-    for i, (sku, metrics) in enumerate(top_products_data.iterrows(), start=1):
-        with columns[i-1]:
-            create_multi_metric_card(i, sku, metrics, translations)
+    # Calculate the top products based on the selected criteria
+    top_products_data = format_top_products(top_skus(rollup, sort_column, int(product_count)), translations)
+
+    # All the cards as one element, wrapped three per row
+    render_card_row([
+        multi_metric_card_html(rank, sku, metrics, translations)
+        for rank, (sku, metrics) in enumerate(top_products_data.iterrows(), start=1)
+    ])
 
+@timed_section('overview.generate_kpi_cards')
 def generate_kpi_cards(data, translations):
     """
     Generate KPI cards for displaying key metrics.
     """ 
 
-    st.markdown("## " + translations["overview_tab"])
-
-    # Calculate KPI values
-    average_price = data['Price'].mean()
-    average_margin = data['Margin'].mean()
-    total_sales = data['Total'].sum()
-    total_profit = data['Profit'].sum()
-    total_items_sold = pd.to_numeric(data['Quantity'], errors='coerce').fillna(0).astype(int).sum()
+    # Calculate KPI values from the shared SKU rollup
+    create_kpi_cards(kpis_from_sku_aggregates(sku_rollup(data)), translations)
 
-   
-    # Create columns for each card
-    col1, col2, col3 = st.columns(3)
+def create_kpi_cards(kpis, translations):
+    """
+    Render the KPI cards from a dict with total_profit, total_sales and
+    total_items_sold.
+    """
+    st.markdown("## " + translations["overview_tab"])
 
-    with col1:
-        create_statistic_card(
+    render_card_row([
+        statistic_card_html(
             translations["total_profit"], 
-            f"{total_profit:,.2f}".replace(',', ' ') + " Dhs", 
+            format_number(kpis['total_profit'], translations, 'currency'), 
             style="warning"
-        )
-
-    with col2:
-        create_statistic_card(
+        ),
+        statistic_card_html(
             translations["total_sales"], 
-            f"{total_sales:,.2f}".replace(',', ' ') + " Dhs", 
+            format_number(kpis['total_sales'], translations, 'currency'), 
             style="info"
-        )
-
-    with col3:
-        create_statistic_card(
+        ),
+        statistic_card_html(
             translations["total_items_sold"], 
-            f"{total_items_sold:,}".replace(',', ' '), 
+            format_number(kpis['total_items_sold'], translations, 'quantity'), 
             style="danger"
-        )
+        ),
+    ])
 
 
 
@@ -261,48 +235,179 @@ def generate_detailed_analysis(data, translations):
     generate_unit_price_distribution_chart(data, translations)
     generate_profit_margin_chart(data, translations)
 
+@timed_section('overview.generate_unit_price_distribution_chart')
 def generate_unit_price_distribution_chart(data, translations):
     st.markdown("### " + translations["unit_price_distribution"])
+    render_chart(
+        chart_key('unit_price_distribution', fingerprint(data), 'Price', translations["unit_price_distribution"]),
+        lambda: draw_unit_price_distribution_chart(data['Price'], translations["unit_price_distribution"])
+    )
+
+def draw_unit_price_distribution_chart(prices, title):
+    """
+    Draws the unit price histogram with its density curve, and returns the
+    figure.
+    """
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots()
-    sns.histplot(data['Price'], bins=20, kde=True, ax=ax)
-    ax.set_title(translations["unit_price_distribution"])
-    st.pyplot(fig)
+    histogram_with_kde(ax, prices, bins=20)
+    ax.set_title(title)
+    return fig
 
+def select_chart_sku_count(translations, key):
+    """
+    Shows the control for how many SKUs a per-SKU chart draws before the
+    rest are grouped into an "Other" bar.
+    """
+    return st.slider(translations["skus_to_plot"], min_value=5, max_value=100, value=20, step=5, key=key)
+
+@timed_section('overview.generate_profit_margin_chart')
 def generate_profit_margin_chart(data, translations):
     st.markdown("### " + translations["profit_margin_by_sku"])
+    show_profit_margin_chart(sku_rollup(data), translations)
+
+@st.fragment
+def show_profit_margin_chart(rollup, translations):
+    """
+    Shows the SKU count slider and the margin chart as a fragment, so
+    moving the slider only redraws this chart.
+    """
+    sku_count = select_chart_sku_count(translations, "profit_margin_chart_skus")
+    reduced = reduce_sku_rollup(rollup, 'Margin', sku_count, translations["other"])
+    render_chart(
+        chart_key('profit_margin_by_sku', fingerprint(rollup), 'Margin', sku_count, translations["profit_margin_by_sku"], translations["other"]),
+        lambda: draw_profit_margin_chart(reduced, translations["profit_margin_by_sku"])
+    )
+
+def draw_profit_margin_chart(rollup, title):
+    """
+    Draws the mean margin bars of a (reduced) SKU rollup, and returns the
+    figure.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     fig, ax = plt.subplots()
-    sns.barplot(x='SKU', y='Margin', data=data, ax=ax)
-    ax.set_title(translations["profit_margin_by_sku"])
+    sns.barplot(x=rollup.index.astype(str), y=rollup['Margin'].values, errorbar=None, ax=ax)
+    ax.set_title(title)
     plt.xticks(rotation=45)
-    st.pyplot(fig)
+    return fig
+
+# Most points a time series is drawn with; longer ranges are downsampled
+TREND_MAX_POINTS = 366
+
+# Best-selling SKUs drawn next to the overall trend
+TREND_SKU_LINES = 5
+
+# Trend metrics and the translation keys of their labels
+TREND_METRICS = {'Total': 'total_sales', 'Quantity': 'total_items_sold', 'Profit': 'total_profit'}
+
+@timed_section('overview.generate_sales_trend_chart')
+def generate_sales_trend_chart(data, translations):
+    """
+    Shows the sales trend over the transaction dates, when the data has a
+    date column.
+    """
+    rollups = time_rollups(data)
+    if rollups is None:
+        return
+    st.markdown("### " + translations["sales_over_time"])
+    show_sales_trend_chart(rollups, sku_rollup(data), translations)
 
+@st.fragment
+def show_sales_trend_chart(rollups, rollup, translations):
+    """
+    Shows the granularity and metric controls and the trend chart as a
+    fragment. Every granularity reads a precomputed rollup, so switching
+    only redraws the chart.
+    """
+    col1, col2 = st.columns(2)
+    with col1:
+        grain = st.radio(
+            translations["time_granularity"],
+            list(TIME_GRAINS),
+            format_func=lambda grain: translations[grain],
+            horizontal=True,
+            key="sales_trend_grain"
+        )
+    with col2:
+        metric = st.selectbox(
+            translations["trend_metric"],
+            list(TREND_METRICS),
+            format_func=lambda metric: translations[TREND_METRICS[metric]],
+            key="sales_trend_metric"
+        )
+
+    skus = top_skus(rollup, metric, TREND_SKU_LINES).index.tolist()
+    overall, per_point = downsample_periods(rollups.overall(grain)[metric], TREND_MAX_POINTS)
+    per_sku, _ = downsample_periods(rollups.per_sku(grain, skus, metric), TREND_MAX_POINTS)
+    label = translations[TREND_METRICS[metric]]
+    render_chart(
+        chart_key('sales_trend', fingerprint(rollup), grain, metric, TREND_MAX_POINTS, tuple(map(str, skus)), label, translations["all_products"]),
+        lambda: draw_sales_trend_chart(overall, per_sku, label, translations["all_products"])
+    )
+    if per_point > 1:
+        st.caption(translations["trend_downsampled"].format(count=per_point))
+
+def draw_sales_trend_chart(overall, per_sku, label, overall_label):
+    """
+    Draws the overall series as a line, with one thinner line per SKU column
+    of `per_sku` on the same dates, and returns the figure.
+    """
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.plot(overall.index, overall.to_numpy(), color='black', linewidth=2, label=overall_label)
+    for sku in per_sku.columns:
+        ax.plot(per_sku.index, per_sku[sku].to_numpy(), linewidth=1, label=str(sku))
+    ax.set_ylabel(label)
+    ax.legend(loc='upper left')
+    fig.autofmt_xdate()
+    fig.tight_layout()
+    return fig
+
+@timed_section('overview.generate_sales_over_time_chart')
 def generate_sales_over_time_chart(data, translations):
     if data.empty:
         st.warning("No data to display. Please adjust the filters.")
         return
+
+    show_sales_over_time_chart(sku_rollup(data), translations)
+
+@st.fragment
+def show_sales_over_time_chart(rollup, translations):
+    """
+    Shows the SKU count slider and the sales chart as a fragment, so
+    moving the slider only redraws this chart.
+    """
+    sku_count = select_chart_sku_count(translations, "sales_chart_skus")
+    reduced = reduce_sku_rollup(rollup, 'Total', sku_count, translations["other"])
+    render_chart(chart_key('sales_over_time', fingerprint(rollup), 'Total', 'Quantity', 'Profit', 'Price', sku_count, translations["other"]), lambda: draw_sales_over_time_chart(reduced))
+
+def draw_sales_over_time_chart(rollup):
+    """
+    Draws the per-SKU sales bars with quantity and profit lines from a SKU
+    rollup, and returns the figure.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    skus = rollup.index.astype(str)
         
     # Set a reasonable figure size
     fig, ax1 = plt.subplots(figsize=(10, 6))  # Adjust as needed
 
     # Plot the total sales bars
-    barplot = sns.barplot(x='SKU', y='Total', data=data, ax=ax1, color='blue', label='Total Sales')
+    barplot = sns.barplot(x=skus, y=rollup['Total'].values, ax=ax1, color='blue', label='Total Sales', errorbar=None)
 
     # Create the secondary y-axis for the total quantity sold
     ax2 = ax1.twinx()
-    lineplot_quantity = sns.lineplot(x='SKU', y='Quantity', data=data, ax=ax2, color='green', marker='o', label='Total Quantity Sold')
-    lineplot_profit = sns.lineplot(x='SKU', y='Profit', data=data, ax=ax2, color='red', marker='x', label='Total Profit Made')
-
-    # Annotate bars with unitary price
-    for index, row in data.iterrows():
-        unit_price = row['Price']  # Assuming 'Price' is the unitary price column in your dataset
-        ax1.text(
-            x=index, 
-            y=row['Total'], 
-            s=f"{unit_price:.2f}",  # Format to 2 decimal places
-            color='black',
-            ha="center",
-            va='bottom'  # To position the text at the top of the bar
-        )
+    lineplot_quantity = sns.lineplot(x=skus, y=rollup['Quantity'].values, ax=ax2, color='green', marker='o', label='Total Quantity Sold', errorbar=None)
+    lineplot_profit = sns.lineplot(x=skus, y=rollup['Profit'].values, ax=ax2, color='red', marker='x', label='Total Profit Made', errorbar=None)
+
+    # Annotate the visible bars with the average unit price of each SKU
+    ax1.bar_label(ax1.containers[0], labels=[f"{unit_price:.2f}" for unit_price in rollup['Price']], color='black')
 
     # Set axis labels and legend
     ax1.set_xlabel('SKU')
@@ -316,11 +421,12 @@ def generate_sales_over_time_chart(data, translations):
     lines_2, labels_2 = ax2.get_legend_handles_labels()
     ax2.legend(lines_1 + lines_2, labels_1 + labels_2, loc='upper left')
 
-    plt.xticks(rotation=45)
+    # Rotate the SKU labels on the bar axes; plt.xticks would target the twin axes
+    ax1.tick_params(axis='x', labelrotation=45)
     plt.tight_layout()
     # Call tight_layout to optimize the layout
     plt.tight_layout()
-    st.pyplot(fig)
+    return fig
 
 
 
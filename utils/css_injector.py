@@ -1,17 +1,59 @@
 import streamlit as st
 import os
 
-def add_custom_css(file_path='static/styles.css'):
+# Stylesheets components register at import time, by name, so each one is
+# sent once per rerun however many elements use it
+_stylesheets = {}
+
+# Rules appended after the registered stylesheets
+_HIDE_MENU_CSS = '#MainMenu {visibility: hidden;}\nfooter {visibility: hidden;}'
+
+
+def register_stylesheet(name, file_path):
     """
-    Reads a CSS file and injects it into the Streamlit app.
+    Registers a CSS file to inject with the app stylesheet. Registering the
+    same name again replaces its path.
 
     Parameters:
+    - name: The name of the stylesheet.
     - file_path: The path to the CSS file.
     """
+    _stylesheets[name] = file_path
+
+
+@st.cache_resource(show_spinner=False)
+def _read_css(file_path, modified):
+    """
+    Reads a CSS file once per modification time; `modified` is only part
+    of the cache key, so an edited file is read again.
+    """
     with open(file_path) as f:
-        css_code = f.read()
-        css_code += '\n#MainMenu {visibility: hidden;}\nfooter {visibility: hidden;}'
-        st.markdown(f'<style>{css_code}</style>', unsafe_allow_html=True)
+        return f.read()
+
+
+def read_css(file_path):
+    """
+    Returns the contents of a CSS file, cached until the file changes.
+    """
+    return _read_css(file_path, os.path.getmtime(file_path))
+
+
+def add_custom_css(file_path='static/styles.css'):
+    """
+    Injects a CSS file and every registered stylesheet into the Streamlit
+    app as a single style element.
+
+    Call it once per full rerun, outside any fragment: fragment reruns keep
+    the styles of the full rerun, and a full rerun drops any element it does
+    not send again.
+
+    Parameters:
+    - file_path: The path to the CSS file.
+    """
+    paths = [file_path] + [path for path in _stylesheets.values() if path != file_path]
+    css_code = '\n'.join(read_css(path) for path in paths) + '\n' + _HIDE_MENU_CSS
+    # A style-only st.html goes to the event container and takes no space
+    st.html(f'<style>{css_code}</style>')
 
 # Example usage
 # Call this function in your main app.py to apply the custom styles
@@ -0,0 +1,103 @@
+import warnings
+
+import pandas as pd
+
+# Column the transaction date is stored in once it is parsed
+DATE_COLUMN = 'Date'
+
+# Headers, lower-cased, recognized as the transaction date, by preference
+DATE_COLUMN_NAMES = [
+    'date', 'transaction date', 'order date', 'sale date', 'invoice date',
+    'date de vente', 'date de commande', 'date de facture', 'jour',
+    'التاريخ', 'تاريخ', 'day', 'datetime', 'timestamp',
+]
+
+# Share of the non-empty values that must parse for a column to hold dates
+DATE_MIN_PARSED = 0.9
+
+# Values parsed per candidate when choosing day-first or month-first
+DATE_SAMPLE_SIZE = 1_000
+
+
+def _date_candidates(data):
+    if DATE_COLUMN in data.columns:
+        return [DATE_COLUMN]
+    names = {str(column).strip().lower(): column for column in data.columns}
+    candidates = [names[name] for name in DATE_COLUMN_NAMES if name in names]
+    # Excel cells typed as dates arrive already parsed, whatever the header
+    candidates += [
+        column for column in data.columns
+        if pd.api.types.is_datetime64_any_dtype(data[column]) and column not in candidates
+    ]
+    return candidates
+
+
+# Ways of reading text dates, tried in order: (format, dayfirst)
+DATE_READINGS = [('ISO8601', False), (None, True), (None, False)]
+
+
+def _to_datetime(values, reading):
+    date_format, dayfirst = reading
+    with warnings.catch_warnings():
+        # Mixed formats fall back to parsing each value, which is only slower
+        warnings.simplefilter('ignore', UserWarning)
+        return pd.to_datetime(values, errors='coerce', format=date_format, dayfirst=dayfirst)
+
+
+def parse_dates(values):
+    """
+    Parses a column of dates, each distinct value once.
+
+    A sample is parsed as ISO 8601, then day-first, as in French and
+    Moroccan exports, then month-first, and the first reading that parses
+    the most of the sample is used for the whole column. Day-first has to
+    come after ISO 8601, which it would read as year-day-month.
+
+    Parameters:
+    - values: A pandas Series of text or datetime values.
+
+    Returns:
+    - A timezone-naive datetime64 Series with NaT where a value is not a
+      date, or None when the column is numeric.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        if isinstance(values.dtype, pd.DatetimeTZDtype):
+            return values.dt.tz_localize(None)
+        return values
+    if pd.api.types.is_numeric_dtype(values):
+        return None
+    # Sales rows repeat the same few dates, so only the distinct values are
+    # parsed and the result is spread back over the rows by their codes
+    codes, uniques = pd.factorize(values)
+    sample = uniques[:DATE_SAMPLE_SIZE]
+    parsed = [_to_datetime(sample, reading).notna().sum() for reading in DATE_READINGS]
+    dates = _to_datetime(uniques, DATE_READINGS[parsed.index(max(parsed))])
+    return pd.Series(dates.take(codes, allow_fill=True, fill_value=pd.NaT), index=values.index, name=values.name)
+
+
+def parse_date_column(data):
+    """
+    Finds the transaction date column of a freshly parsed DataFrame, parses
+    it once and stores it in place as a datetime column named DATE_COLUMN,
+    so later stages never parse dates again.
+
+    The column is recognized by its header (DATE_COLUMN_NAMES, in English,
+    French or Arabic) or by already holding datetimes, and only kept when at
+    least DATE_MIN_PARSED of its values are dates.
+
+    Parameters:
+    - data: The DataFrame, after the column renames.
+
+    Returns:
+    - The original name of the date column, or None if there is none.
+    """
+    for column in _date_candidates(data):
+        values = data[column]
+        dates = parse_dates(values)
+        if dates is None or dates.notna().sum() < DATE_MIN_PARSED * values.notna().sum() or dates.isna().all():
+            continue
+        data[column] = dates
+        if column != DATE_COLUMN:
+            data.rename(columns={column: DATE_COLUMN}, inplace=True)
+        return column
+    return None
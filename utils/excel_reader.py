@@ -0,0 +1,127 @@
+import io
+import os
+import tempfile
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from utils.workers import process_pool
+
+# Column holding the name of the sheet each row was read from
+SHEET_COLUMN = 'Sheet'
+
+# Rows buffered as Python tuples before they are turned into a DataFrame
+SHEET_CHUNK_ROWS = 50_000
+
+
+def _header_names(header):
+    return [
+        str(name) if name is not None else f'Unnamed: {position}'
+        for position, name in enumerate(header)
+    ]
+
+
+def _rows_to_frame(rows, columns):
+    # Same conversions as pd.read_excel, so numeric-looking text such as
+    # SKU codes gets the same dtype as in a full-load read
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    with TextParser(rows, names=columns) as parser:
+        return parser.read()
+
+
+def read_xlsx_sheet(path, sheet_name, chunk_rows=SHEET_CHUNK_ROWS):
+    """
+    Stream one worksheet of an .xlsx workbook into a DataFrame.
+
+    The workbook is opened in read-only mode, so cells are read row by row
+    instead of loading the whole workbook into memory, and rows are turned
+    into DataFrame chunks every `chunk_rows` rows. The first row is the
+    header; fully empty rows are skipped.
+
+    Parameters:
+    - path: Path to the workbook.
+    - sheet_name: The worksheet to read.
+    - chunk_rows: Rows buffered before they are converted.
+
+    Returns:
+    - A DataFrame with the sheet's rows and a SHEET_COLUMN column.
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name]
+        # Some writers record a wrong sheet size; read what is actually there
+        worksheet.reset_dimensions()
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame({SHEET_COLUMN: pd.Series(dtype='str')})
+        columns = _header_names(header)
+
+        chunks = []
+        buffer = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            buffer.append(list(row[:len(columns)]))
+            if len(buffer) >= chunk_rows:
+                chunks.append(_rows_to_frame(buffer, columns))
+                buffer = []
+        if buffer or not chunks:
+            chunks.append(_rows_to_frame(buffer, columns))
+    finally:
+        workbook.close()
+
+    data = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    data[SHEET_COLUMN] = sheet_name
+    return data
+
+
+def _read_xlsx(file_bytes, max_workers):
+    import openpyxl
+
+    # Workers open the workbook from disk rather than receiving the bytes,
+    # so a large upload is not copied into every process
+    with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as handle:
+        handle.write(file_bytes)
+        path = handle.name
+    try:
+        workbook = openpyxl.load_workbook(path, read_only=True)
+        sheet_names = workbook.sheetnames
+        workbook.close()
+
+        workers = min(len(sheet_names), max_workers or os.cpu_count() or 1)
+        if workers <= 1:
+            return [read_xlsx_sheet(path, name) for name in sheet_names]
+        with process_pool(workers) as executor:
+            return list(executor.map(read_xlsx_sheet, [path] * len(sheet_names), sheet_names))
+    finally:
+        os.unlink(path)
+
+
+def read_excel_sheets(file_bytes, file_extension, max_workers=None):
+    """
+    Read every sheet of an Excel workbook into one DataFrame.
+
+    .xlsx workbooks are streamed in read-only mode, one sheet per worker
+    process. Legacy .xls workbooks go through pandas, which reads them whole.
+
+    Parameters:
+    - file_bytes: The workbook contents.
+    - file_extension: 'xlsx' or 'xls'.
+    - max_workers: Upper bound on worker processes; defaults to the CPU count.
+
+    Returns:
+    - A DataFrame with the rows of all sheets, in sheet order, and a
+      SHEET_COLUMN column naming the sheet of each row.
+    """
+    if file_extension == 'xls':
+        sheets = pd.read_excel(io.BytesIO(file_bytes), sheet_name=None)
+        frames = [frame.assign(**{SHEET_COLUMN: name}) for name, frame in sheets.items()]
+    else:
+        frames = _read_xlsx(file_bytes, max_workers)
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,108 @@
+import hashlib
+import weakref
+
+import pandas as pd
+
+
+class _IndexRef:
+    """
+    A weak reference to the index of the frame a fingerprint was recorded
+    on. pandas copies attrs onto frames derived by sorting, filling,
+    assigning and the like, which keep the shape but may change the values
+    or the row order; each of those gets a new index, so a recorded value is
+    only trusted on a frame whose index is still the one it was set with.
+    Copies of the reference, including pickled ones, point at nothing.
+    """
+
+    def __init__(self, index=None):
+        self._ref = None if index is None else weakref.ref(index)
+
+    def __reduce__(self):
+        return _IndexRef, ()
+
+    def refers_to(self, index):
+        return self._ref is not None and self._ref() is index
+
+
+def _recorded(data, key):
+    """
+    Returns the value recorded in data.attrs under `key`, or None if there is
+    none or it was recorded on another frame.
+    """
+    recorded = data.attrs.get(key)
+    if recorded is not None and recorded[0] == data.shape and recorded[1].refers_to(data.index):
+        return recorded[2]
+    return None
+
+
+def fingerprint(data):
+    """
+    Returns a fingerprint that identifies the contents of a DataFrame.
+
+    Frames produced by process_data carry the hash of their source file, and
+    frames filtered in app.main carry a fingerprint derived from it, so this
+    is usually free. For any other frame, including one derived from those
+    without a fingerprint of its own, the contents are hashed.
+
+    Parameters:
+    - data: A DataFrame or Series.
+
+    Returns:
+    - A hex string.
+    """
+    recorded = _recorded(data, 'fingerprint')
+    if recorded is not None:
+        return recorded
+    return hash_content(data)
+
+
+def set_fingerprint(data, value):
+    """
+    Records the fingerprint of a DataFrame so later lookups need no hashing.
+    """
+    data.attrs['fingerprint'] = (data.shape, _IndexRef(data.index), value)
+    return data
+
+
+def derive_fingerprint(parent, *parts):
+    """
+    Builds the fingerprint of a frame derived from a fingerprinted parent by
+    a deterministic step described by `parts` (e.g. the selected SKUs).
+    """
+    digest = hashlib.sha256(parent.encode('utf-8'))
+    digest.update(repr(parts).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def set_append_history(data, history):
+    """
+    Records the earlier versions of a dataset built by appending rows, as
+    (fingerprint, row count) pairs, oldest first. Each earlier version is
+    the first `row count` rows of `data`, so aggregates of the dataset can
+    be updated from the rows appended since instead of computed again.
+    """
+    data.attrs['append_history'] = (data.shape, _IndexRef(data.index), tuple(history))
+    return data
+
+
+def append_history(data):
+    """
+    Returns the append history recorded by set_append_history, or an empty
+    tuple when there is none or it was recorded on another frame.
+    """
+    recorded = _recorded(data, 'append_history')
+    if recorded is not None:
+        return recorded
+    return ()
+
+
+def hash_content(data):
+    """
+    Hashes the values and index of a DataFrame or Series.
+    """
+    digest = hashlib.sha256(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    if isinstance(data, pd.DataFrame):
+        digest.update(repr(list(data.columns)).encode('utf-8'))
+    else:
+        digest.update(repr(data.name).encode('utf-8'))
+    return digest.hexdigest()
@@ -0,0 +1,118 @@
+import numpy as np
+
+# Decimal places and translation key of the pattern for each kind of value
+NUMBER_KINDS = {
+    'currency': (2, 'currency_format'),
+    'quantity': (0, None),
+    'percent': (1, 'percent_format'),
+    'number': (2, None),
+}
+
+# Shown for missing and infinite values
+MISSING_VALUE = '–'
+
+# Scaled values from this size on cannot be rounded exactly in float64, and
+# from _GROUPED_LIMIT on do not fit the int64 grouping
+_EXACT_LIMIT = 2 ** 52
+_GROUPED_LIMIT = 2 ** 62
+
+
+# Every three-digit group as text, unpadded and zero-padded; indexing these
+# is much cheaper than converting each group with astype(str)
+_GROUPS = np.array([str(number) for number in range(1000)])
+_PADDED_GROUPS = np.char.zfill(_GROUPS, 3)
+
+
+def _group_digits(integers, separator):
+    """
+    Formats non-negative int64 values with `separator` between groups of
+    three digits, one numpy string operation per group over the whole array.
+    """
+    groups = 1
+    while groups < 7 and (integers >= 1000 ** groups).any():
+        groups += 1
+    if groups == 1:
+        return _GROUPS[integers]
+    # Start from each value's leading group, then append the lower groups
+    # zero-padded, for the values that have them
+    leading = 1 + sum((integers >= 1000 ** group).astype('int64') for group in range(1, groups))
+    result = _GROUPS[integers // np.power(1000, leading - 1)]
+    for group in range(groups - 2, -1, -1):
+        lower = _PADDED_GROUPS[(integers // 1000 ** group) % 1000]
+        result = np.where(leading > group + 1, np.char.add(np.char.add(result, separator), lower), result)
+    return result
+
+
+def _fraction_digits(fractions, decimals):
+    if decimals <= 3:
+        return np.char.zfill(_GROUPS[:10 ** decimals], decimals)[fractions]
+    return np.char.zfill(fractions.astype(str), decimals)
+
+
+def _format_large(value, decimals, translations):
+    integer, _, fraction = f"{value:.{decimals}f}".partition('.')
+    text = f"{int(integer):,}".replace(',', translations["thousands_separator"])
+    return f"{text}{translations['decimal_separator']}{fraction}" if decimals else text
+
+
+def format_numbers(values, translations, kind='number', decimals=None):
+    """
+    Formats an array of numbers for display, without the process locale.
+
+    Separators and the currency and percent patterns come from the
+    translations of the selected language ('decimal_separator',
+    'thousands_separator', 'currency_format' and 'percent_format'), so the
+    formatting is a pure function of its inputs and safe to call from any
+    session thread.
+
+    Parameters:
+    - values: An array-like of numbers.
+    - translations: The translations of the selected language.
+    - kind: One of NUMBER_KINDS: 'currency' (two decimals and the currency
+      pattern), 'quantity' (whole numbers), 'percent' or 'number'.
+    - decimals: Overrides the decimal places of `kind`.
+
+    Returns:
+    - A numpy array of strings, MISSING_VALUE where a value is NaN or
+      infinite.
+    """
+    default_decimals, pattern_key = NUMBER_KINDS[kind]
+    decimals = default_decimals if decimals is None else decimals
+    values = np.asarray(values, dtype='float64').ravel()
+
+    scale = 10 ** decimals
+    finite = np.isfinite(values)
+    magnitudes = np.abs(np.where(finite, values, 0.0))
+    products = magnitudes * scale
+    grouped = products < _GROUPED_LIMIT
+    scaled = np.rint(np.where(grouped, products, 0.0)).astype('int64')
+    # The product is itself rounded, so where it lies within a few units in
+    # the last place of a half, or is too large to hold the fraction, rint
+    # may round the other way than the exact value. Those are rounded as
+    # f"{value:.2f}" rounds, from the exact decimal value of the float
+    near_half = np.abs(products - np.floor(products) - 0.5) <= 4 * np.spacing(products)
+    for position in np.flatnonzero(grouped & (near_half | (products >= _EXACT_LIMIT))):
+        scaled[position] = int(f"{magnitudes[position]:.{decimals}f}".replace('.', ''))
+    text = _group_digits(scaled // scale, translations["thousands_separator"])
+    if decimals:
+        fraction = _fraction_digits(scaled % scale, decimals)
+        text = np.char.add(np.char.add(text, translations["decimal_separator"]), fraction)
+    if not grouped.all():
+        # Beyond int64, digits are grouped one value at a time
+        text = text.astype(object)
+        text[~grouped] = [_format_large(value, decimals, translations) for value in magnitudes[~grouped]]
+        text = text.astype(str)
+    # Values that round to zero lose their sign
+    text = np.where((values < 0) & ((scaled > 0) | ~grouped), np.char.add('-', text), text)
+
+    if pattern_key:
+        prefix, _, suffix = translations[pattern_key].partition('{}')
+        text = np.char.add(np.char.add(prefix, text), suffix)
+    return np.where(finite, text, MISSING_VALUE)
+
+
+def format_number(value, translations, kind='number', decimals=None):
+    """
+    Formats a single number; see format_numbers.
+    """
+    return str(format_numbers([value], translations, kind, decimals)[0])
@@ -0,0 +1,202 @@
+import contextlib
+import contextvars
+import datetime
+import functools
+import json
+import threading
+import time
+import tracemalloc
+import uuid
+
+import pandas as pd
+import streamlit as st
+
+# JSON lines file every instrumented rerun is appended to
+TIMING_LOG_PATH = 'stage_timings.jsonl'
+
+# The recorder of the rerun in progress, or None when instrumentation is off
+_current_run = contextvars.ContextVar('current_run', default=None)
+
+# tracemalloc is process-wide and sessions rerun concurrently, so tracing
+# is shared: it runs while any instrumented rerun does, and its peak is only
+# reset after being folded into the peak of every open stage of every session
+_tracing_lock = threading.Lock()
+_tracing_runs = 0
+_started_tracing = False
+# Peak traced bytes seen by each open stage, keyed by its StageRecord
+_open_peaks = {}
+
+
+def _fold_peak():
+    # Caller holds _tracing_lock
+    current, peak = tracemalloc.get_traced_memory()
+    for record, seen in _open_peaks.items():
+        _open_peaks[record] = max(seen, peak)
+    tracemalloc.reset_peak()
+    return current
+
+
+class StageRecord:
+    """
+    The measurements of one stage: wall time, rows in and out, and the peak
+    traced memory above what was allocated when the stage started. Memory
+    is traced for the whole process, so the peak includes the allocations
+    of other sessions running at the same time.
+    """
+    def __init__(self, name, depth, rows_in=None):
+        self.name = name
+        self.depth = depth
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.seconds = None
+        self.peak_bytes = None
+
+    def as_dict(self):
+        return {
+            'stage': self.name,
+            'depth': self.depth,
+            'seconds': self.seconds,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'peak_bytes': self.peak_bytes,
+        }
+
+
+class RunRecorder:
+    """
+    Collects the stage records of one rerun, in the order the stages start.
+    """
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = datetime.datetime.now(datetime.timezone.utc)
+        self.stages = []
+
+    def enter(self, record):
+        with _tracing_lock:
+            current = _fold_peak()
+            _open_peaks[record] = current
+        self.stages.append(record)
+        return current
+
+    def exit(self, record, start_bytes):
+        with _tracing_lock:
+            _fold_peak()
+            peak = _open_peaks.pop(record)
+        record.peak_bytes = max(0, peak - start_bytes)
+
+    def frame(self):
+        """
+        Returns the stage records as a DataFrame, nested stages indented.
+        """
+        rows = [record.as_dict() for record in self.stages]
+        frame = pd.DataFrame(rows, columns=['stage', 'depth', 'seconds', 'rows_in', 'rows_out', 'peak_bytes'])
+        frame['stage'] = ['  ' * depth + name for name, depth in zip(frame['stage'], frame['depth'])]
+        # Traced for the whole process, not only this session
+        frame['process_peak_mb'] = frame['peak_bytes'] / (1024 * 1024)
+        return frame.drop(columns=['depth', 'peak_bytes'])
+
+    def append_to_log(self, path=TIMING_LOG_PATH):
+        """
+        Appends one JSON line per stage to `path`.
+        """
+        with open(path, 'a', encoding='utf-8') as log:
+            for record in self.stages:
+                log.write(json.dumps({
+                    'run': self.run_id,
+                    'time': self.started.isoformat(timespec='seconds'),
+                    **record.as_dict(),
+                }) + '\n')
+
+
+@contextlib.contextmanager
+def record_run(enabled):
+    """
+    Instruments the stages run inside the block when `enabled`; otherwise
+    stage() and timed_section() only cost a context variable lookup.
+
+    Yields:
+    - The RunRecorder of this rerun, or None when disabled.
+    """
+    if not enabled:
+        yield None
+        return
+    global _tracing_runs, _started_tracing
+    recorder = RunRecorder()
+    with _tracing_lock:
+        if _tracing_runs == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_runs += 1
+    token = _current_run.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current_run.reset(token)
+        with _tracing_lock:
+            _tracing_runs -= 1
+            # Stopped by the last instrumented rerun, and only if started here
+            if _tracing_runs == 0 and _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
+
+
+@contextlib.contextmanager
+def stage(name, rows_in=None):
+    """
+    Measures the block as one stage of the current rerun. Set `rows_out`
+    on the yielded record to report the rows the stage produced.
+
+    Parameters:
+    - name: The stage name shown in the debug panel and the log.
+    - rows_in: The number of rows the stage reads.
+    """
+    recorder = _current_run.get()
+    depth = sum(1 for record in recorder.stages if record.seconds is None) if recorder else 0
+    record = StageRecord(name, depth, rows_in)
+    if recorder is None:
+        yield record
+        return
+    start_bytes = recorder.enter(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.seconds = time.perf_counter() - start
+        recorder.exit(record, start_bytes)
+
+
+def _rows(value):
+    return len(value) if isinstance(value, (pd.DataFrame, pd.Series)) else None
+
+
+def timed_section(name):
+    """
+    Decorates a dashboard section function so each call is measured as a
+    stage. Rows in are taken from the first DataFrame argument and rows out
+    from a returned DataFrame.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_run.get() is None:
+                return func(*args, **kwargs)
+            rows_in = next((_rows(arg) for arg in args if _rows(arg) is not None), None)
+            with stage(name, rows_in) as record:
+                result = func(*args, **kwargs)
+                record.rows_out = _rows(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def show_debug_panel(recorder, translations):
+    """
+    Shows the stage timings of this rerun in the sidebar and appends them
+    to TIMING_LOG_PATH.
+    """
+    if recorder is None:
+        return
+    recorder.append_to_log()
+    with st.sidebar.expander(translations["debug_panel"], expanded=True):
+        st.dataframe(recorder.frame(), hide_index=True)
+        st.caption(translations["debug_panel_caption"].format(run=recorder.run_id, path=TIMING_LOG_PATH))
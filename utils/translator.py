@@ -41,6 +41,40 @@ class Translator:
                 "profitability_analysis": "Profitability Analysis",
                 "select_products_to_view": "Select products to view",
                 "no_product_selected_warning": "No product selected. Please select at least one product to view.",
+                "streaming_mode": "Streaming mode (large files)",
+                "streaming_mode_help": "Read the file in chunks and keep only per-product totals in memory.",
+                "streaming_mode_info": "Streaming mode: only the overview and top products are shown for this file.",
+                "stored_datasets": "Open a previous upload",
+                "no_stored_dataset": "None",
+                "products_to_show": "Number of products to show",
+                "skus_to_plot": "SKUs to plot",
+                "other": "Other",
+                "no_sorting": "Original order",
+                "sort_order": "Order",
+                "ascending": "Ascending",
+                "descending": "Descending",
+                "rows_per_page": "Rows per page",
+                "page_number": "Page",
+                "rows_summary": "Showing rows {first}–{last} of {total} ({columns} columns, {pages} pages)",
+                "export_format": "Export format",
+                "download_data": "Download data",
+                "show_memory_report": "Show memory usage",
+                "debug_panel": "Performance debug panel",
+                "debug_panel_caption": "Run {run}; appended to {path}",
+                "decimal_separator": ".",
+                "thousands_separator": " ",
+                "currency_format": "{} Dhs",
+                "percent_format": "{}%",
+                "time_granularity": "Granularity",
+                "day": "Day",
+                "week": "Week",
+                "month": "Month",
+                "trend_metric": "Metric",
+                "all_products": "All products",
+                "trend_downsampled": "Long range: each point sums {count} consecutive periods.",
+                "append_mode": "Append to current dataset",
+                "append_mode_help": "New uploads are added to the dataset already loaded instead of replacing it. Only the new files are read, and the totals and rankings are updated from their rows.",
+                "append_mode_info": "Files appended: {files}. Rows in the current dataset: {rows}.",
 
             },
             "Français": {
@@ -80,6 +114,40 @@ class Translator:
                 "profitability_analysis": "Analyse de la Rentabilité",
                 "select_products_to_view": "Sélectionnez les produits à afficher",
                 "no_product_selected_warning": "Aucun produit sélectionné. Veuillez sélectionner au moins un produit à afficher.",
+                "streaming_mode": "Mode flux (fichiers volumineux)",
+                "streaming_mode_help": "Lire le fichier par blocs et ne garder en mémoire que les totaux par produit.",
+                "streaming_mode_info": "Mode flux : seuls l'aperçu et les meilleurs produits sont affichés pour ce fichier.",
+                "stored_datasets": "Ouvrir un fichier déjà téléchargé",
+                "no_stored_dataset": "Aucun",
+                "products_to_show": "Nombre de produits à afficher",
+                "skus_to_plot": "SKU à afficher",
+                "other": "Autres",
+                "no_sorting": "Ordre d'origine",
+                "sort_order": "Ordre",
+                "ascending": "Croissant",
+                "descending": "Décroissant",
+                "rows_per_page": "Lignes par page",
+                "page_number": "Page",
+                "rows_summary": "Lignes {first}–{last} sur {total} ({columns} colonnes, {pages} pages)",
+                "export_format": "Format d'export",
+                "download_data": "Télécharger les données",
+                "show_memory_report": "Afficher l'utilisation de la mémoire",
+                "debug_panel": "Panneau de diagnostic des performances",
+                "debug_panel_caption": "Exécution {run} ; ajoutée à {path}",
+                "decimal_separator": ",",
+                "thousands_separator": " ",
+                "currency_format": "{} Dhs",
+                "percent_format": "{} %",
+                "time_granularity": "Granularité",
+                "day": "Jour",
+                "week": "Semaine",
+                "month": "Mois",
+                "trend_metric": "Indicateur",
+                "all_products": "Tous les produits",
+                "trend_downsampled": "Longue période : chaque point additionne {count} périodes consécutives.",
+                "append_mode": "Ajouter au jeu de données actuel",
+                "append_mode_help": "Les nouveaux fichiers sont ajoutés au jeu de données déjà chargé au lieu de le remplacer. Seuls les nouveaux fichiers sont lus, et les totaux et classements sont mis à jour à partir de leurs lignes.",
+                "append_mode_info": "Fichiers ajoutés : {files}. Lignes du jeu de données actuel : {rows}.",
             },
             "العربية": {
                 "title": "لوحة مبيعات المنتجات",
@@ -118,6 +186,40 @@ class Translator:
                 "profitability_analysis": "تحليل الربحية",
                 "select_products_to_view": "حدد المنتجات لعرضها",
                 "no_product_selected_warning": "لم يتم تحديد أي منتج. يرجى تحديد منتج واحد على الأقل لعرضه.",
+                "streaming_mode": "وضع التدفق (ملفات كبيرة)",
+                "streaming_mode_help": "قراءة الملف على دفعات والاحتفاظ فقط بالمجاميع لكل منتج في الذاكرة.",
+                "streaming_mode_info": "وضع التدفق: يتم عرض النظرة العامة وأفضل المنتجات فقط لهذا الملف.",
+                "stored_datasets": "فتح ملف تم تحميله سابقا",
+                "no_stored_dataset": "لا شيء",
+                "products_to_show": "عدد المنتجات المعروضة",
+                "skus_to_plot": "عدد الأرقام التسلسلية المعروضة",
+                "other": "أخرى",
+                "no_sorting": "الترتيب الأصلي",
+                "sort_order": "الترتيب",
+                "ascending": "تصاعدي",
+                "descending": "تنازلي",
+                "rows_per_page": "عدد الصفوف في الصفحة",
+                "page_number": "الصفحة",
+                "rows_summary": "عرض الصفوف {first}–{last} من {total} ({columns} أعمدة، {pages} صفحات)",
+                "export_format": "صيغة التصدير",
+                "download_data": "تحميل البيانات",
+                "show_memory_report": "عرض استخدام الذاكرة",
+                "debug_panel": "لوحة تشخيص الأداء",
+                "debug_panel_caption": "التشغيل {run}؛ أضيف إلى {path}",
+                "decimal_separator": ",",
+                "thousands_separator": ".",
+                "currency_format": "{} Dhs",
+                "percent_format": "{}%",
+                "time_granularity": "الدقة الزمنية",
+                "day": "يوم",
+                "week": "أسبوع",
+                "month": "شهر",
+                "trend_metric": "المؤشر",
+                "all_products": "جميع المنتجات",
+                "trend_downsampled": "فترة طويلة: كل نقطة تجمع {count} فترات متتالية.",
+                "append_mode": "الإضافة إلى مجموعة البيانات الحالية",
+                "append_mode_help": "تُضاف الملفات الجديدة إلى مجموعة البيانات المحمّلة بدلاً من استبدالها. تُقرأ الملفات الجديدة فقط، وتُحدَّث المجاميع والترتيب من صفوفها.",
+                "append_mode_info": "الملفات المضافة: {files}. صفوف مجموعة البيانات الحالية: {rows}.",
             },
             "ⵜⴰⵎⴰⵣⵉⵖⵜ": {
                 "title": "ⵜⴰⴽⵡⵉⵍⵜ ⵏ ⵜⵓⴳⴳⴰⵔⴰ ⵏ ⵉⵎⴰⵍⵢⴰⵏ",
@@ -244,9 +346,10 @@ class Translator:
         - key: The key for the translation term.
 
         Returns:
-        - The translated string if available, otherwise the key itself.
+        - The translated string if available, otherwise the English string,
+          otherwise the key itself.
         """
-        return self.translations.get(language, {}).get(key, key)
+        return self.translations.get(language, {}).get(key, self.translations["English"].get(key, key))
 
 # Usage example
 # translator = Translator()
@@ -0,0 +1,67 @@
+import importlib
+import os
+import threading
+import time
+
+# Modules charts and exports import on first use, in the order they are needed
+WARMUP_MODULES = ('matplotlib.pyplot', 'seaborn', 'pyarrow.parquet', 'openpyxl')
+
+# Set to 0 to turn the warm-up off, e.g. when workers are short on memory
+WARMUP_ENV = 'DASHBOARD_WARMUP'
+
+_lock = threading.Lock()
+_thread = None
+
+# Seconds the last warm-up took, or None until it finishes
+warmup_seconds = None
+
+
+def _draw_figure():
+    # The first draw loads the font cache, the Agg renderer and seaborn's
+    # palette, which otherwise happens under the first chart's render
+    import seaborn as sns
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure()
+    axes = figure.subplots()
+    axes.bar([0, 1], [1, 2], color=sns.color_palette()[0])
+    axes.set_title('warm-up')
+    FigureCanvasAgg(figure).draw()
+
+
+def _warm_up(modules):
+    global warmup_seconds
+    start = time.perf_counter()
+    for module in modules:
+        importlib.import_module(module)
+    if 'matplotlib.pyplot' in modules:
+        _draw_figure()
+    warmup_seconds = time.perf_counter() - start
+
+
+def warmup_enabled():
+    return os.environ.get(WARMUP_ENV, '1') != '0'
+
+
+def start_warmup(modules=WARMUP_MODULES):
+    """
+    Imports and initializes the modules the first chart or export needs in
+    a background thread, at most once per process, so the first upload does
+    not pay for them. Does nothing when turned off with DASHBOARD_WARMUP=0.
+
+    Call it after the page has been sent, e.g. once the upload prompt is
+    shown. Imports in the script thread wait for the warm-up's import of the
+    same module instead of repeating it.
+
+    Returns:
+    - The warm-up thread, or None when the warm-up is turned off.
+    """
+    global _thread
+    if not warmup_enabled():
+        return None
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_warm_up, args=(tuple(modules),), name='warmup', daemon=True)
+            _thread.start()
+        return _thread
@@ -0,0 +1,28 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Start method of worker processes. The server runs every session in its own
+# thread, and forking a multithreaded process can copy a lock another thread
+# holds into the child, which then waits on it forever; a fork server starts
+# workers from a clean single-threaded process instead
+WORKER_START_METHODS = ('forkserver', 'spawn')
+
+# Modules the fork server imports once, so workers forked from it start
+# without importing them again: the main script, which workers load as
+# __mp_main__ and which under Streamlit is the app, and what the workers run
+WORKER_PRELOAD = ['__main__', 'data_processor', 'openpyxl']
+
+
+def process_pool(max_workers):
+    """
+    Returns a ProcessPoolExecutor whose workers are not forked from the
+    server process, with the first of WORKER_START_METHODS the platform
+    supports. Worker functions must be importable module-level functions.
+    """
+    available = multiprocessing.get_all_start_methods()
+    method = next(method for method in WORKER_START_METHODS if method in available)
+    context = multiprocessing.get_context(method)
+    if method == 'forkserver':
+        # Only read when the fork server starts, i.e. by the first pool
+        context.set_forkserver_preload(WORKER_PRELOAD)
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=context)